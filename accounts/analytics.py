@@ -0,0 +1,161 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+# 影響快照的員工欄位，順序與 snapshot_key() 的參數相同
+COUNTED_FIELDS = ('department_id', 'job_title_id', 'gender', 'birth_date')
+# 快照的維度；沒有部門或職稱時記為 0，唯一約束才不會因 NULL 失效
+SNAPSHOT_DIMENSIONS = ('department_id', 'job_title_id', 'gender', 'age_band')
+# (最小年齡, 上限（不含）, 標籤)
+AGE_BANDS = (
+    (0, 25, '<25'),
+    (25, 35, '25-34'),
+    (35, 45, '35-44'),
+    (45, 55, '45-54'),
+    (55, None, '55+'),
+)
+UNKNOWN_AGE_BAND = '未填'
+# 儀表板趨勢圖的天數
+ANALYTICS_TREND_DAYS = 90
+
+
+def age_band(birth_date, today=None):
+    """The ``AGE_BANDS`` label of someone born on ``birth_date``."""
+    if not birth_date:
+        return UNKNOWN_AGE_BAND
+    today = today or timezone.localdate()
+    age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+    for lowest, limit, label in AGE_BANDS:
+        if age >= lowest and (limit is None or age < limit):
+            return label
+    return AGE_BANDS[0][2]
+
+
+def snapshot_key(department_id, job_title_id, gender, birth_date, today=None):
+    """The ``HeadcountSnapshot`` cell an employee with these values is counted in."""
+    return (department_id or 0, job_title_id or 0, gender or '', age_band(birth_date, today))
+
+
+def snapshot_deltas(removed=(), added=()):
+    """``{key: delta}`` moving employees out of the ``removed`` and into the ``added`` field tuples."""
+    today = timezone.localdate()
+    deltas = Counter(snapshot_key(*values, today=today) for values in added)
+    deltas.subtract(snapshot_key(*values, today=today) for values in removed)
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def adjust_snapshot(removed=(), added=()):
+    """Apply an employee change to the snapshot in the caller's transaction."""
+    from .models import HeadcountSnapshot
+
+    HeadcountSnapshot.objects.adjust(snapshot_deltas(removed, added))
+
+
+def rebuild_snapshot():
+    """
+    Recompute ``HeadcountSnapshot`` from the employee table.
+
+    Run nightly by ``manage.py rebuild_analytics``: ages move on with the
+    calendar while the incremental updates only see employee changes.
+    Returns the number of employees counted.
+    """
+    from .models import Employee, HeadcountSnapshot
+
+    today = timezone.localdate()
+    counts = Counter()
+    rows = (
+        Employee.objects.order_by()
+        .values_list(*COUNTED_FIELDS)
+        .annotate(total=Count('pk'))
+    )
+    for *values, total in rows:
+        counts[snapshot_key(*values, today=today)] += total
+    with transaction.atomic():
+        HeadcountSnapshot.objects.all().delete()
+        HeadcountSnapshot.objects.bulk_create([
+            HeadcountSnapshot(**dict(zip(SNAPSHOT_DIMENSIONS, key)), count=count)
+            for key, count in counts.items()
+        ])
+    return sum(counts.values())
+
+
+def record_history(day=None):
+    """Copy the current snapshot into ``HeadcountHistory`` as the figures of ``day`` (today by default)."""
+    from .models import HeadcountHistory, HeadcountSnapshot
+
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        HeadcountHistory.objects.filter(date=day).delete()
+        rows = HeadcountSnapshot.objects.filter(count__gt=0).values_list(*SNAPSHOT_DIMENSIONS, 'count')
+        HeadcountHistory.objects.bulk_create([
+            HeadcountHistory(date=day, **dict(zip(SNAPSHOT_DIMENSIONS, values)), count=count)
+            for *values, count in rows
+        ])
+    return day
+
+
+def _trend(by_gender, days):
+    from .models import Employee, HeadcountHistory
+
+    today = timezone.localdate()
+    totals = {}
+    rows = (
+        HeadcountHistory.objects
+        .filter(date__gte=today - timedelta(days=days))
+        .order_by()
+        .values_list('date', 'gender')
+        .annotate(total=Sum('count'))
+    )
+    for day, gender, total in rows:
+        totals.setdefault(day, Counter())[gender] = total
+    # 今天的數字取自即時快照，夜間作業寫入前也能看到
+    totals[today] = by_gender
+    genders = dict(Employee.GENDER_CHOICES)
+    days = sorted(totals)
+    return {
+        'labels': [day.isoformat() for day in days],
+        'datasets': [
+            {'label': label, 'data': [totals[day][gender] for day in days]}
+            for gender, label in genders.items()
+        ],
+    }
+
+
+def dashboard_data(days=ANALYTICS_TREND_DAYS):
+    """
+    Headcount by department × job-title level, gender and age band, plus
+    the daily trend; read from the snapshot and history tables only.
+    """
+    from .catalog import reference_data
+    from .models import Employee, HeadcountSnapshot, JobTitle
+
+    departments, = reference_data('department')
+    levels = dict(JobTitle.objects.values_list('id', 'level'))
+    by_cell, by_gender, by_age = Counter(), Counter(), Counter()
+    cells = HeadcountSnapshot.objects.filter(count__gt=0).values_list(*SNAPSHOT_DIMENSIONS, 'count')
+    for department_id, job_title_id, gender, band, count in cells:
+        # 已刪除的職稱與沒有職稱一樣歸在職級 0
+        by_cell[department_id, levels.get(job_title_id, 0)] += count
+        by_gender[gender] += count
+        by_age[band] += count
+
+    level_columns = sorted({level for _, level in by_cell})
+    rows = []
+    for department_id, name in [*departments, (0, '未分配')]:
+        counts = [by_cell[department_id, level] for level in level_columns]
+        if any(counts):
+            rows.append({'name': name, 'counts': counts, 'total': sum(counts)})
+    genders = dict(Employee.GENDER_CHOICES)
+    bands = [label for _, _, label in AGE_BANDS] + [UNKNOWN_AGE_BAND]
+    return {
+        'total': sum(by_gender.values()),
+        'level_columns': level_columns,
+        'level_totals': [sum(row['counts'][index] for row in rows) for index in range(len(level_columns))],
+        'department_rows': rows,
+        'gender_split': [(label, by_gender[gender]) for gender, label in genders.items()],
+        'age_bands': [(band, by_age[band]) for band in bands],
+        'trend': _trend(by_gender, days),
+    }
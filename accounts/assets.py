@@ -0,0 +1,173 @@
+import base64
+import gzip
+import hashlib
+import mimetypes
+import os
+import urllib.request
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+try:
+    import brotli
+except ImportError:  # 未安裝 brotli 時只產生 gzip 版本
+    brotli = None
+
+# 靜態檔案位於 accounts/static/ 下的路徑
+VENDOR_DIR = 'accounts/vendor'
+
+
+class VendorAsset:
+    """A third-party file served from our static files, with its pinned CDN origin."""
+
+    def __init__(self, path, url, integrity=''):
+        self.path = f'{VENDOR_DIR}/{path}'
+        self.url = url
+        self.integrity = integrity
+
+    @property
+    def kind(self):
+        return 'css' if self.path.endswith('.css') else 'js'
+
+
+# 版本固定；更新版本後重新執行 manage.py vendor_assets 並提交下載的檔案
+VENDOR_ASSETS = {
+    'bootstrap.css': VendorAsset(
+        'bootstrap-5.3.0/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    ),
+    'bootstrap.js': VendorAsset(
+        'bootstrap-5.3.0/bootstrap.bundle.min.js',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    ),
+    'chart.js': VendorAsset(
+        'chart.js-4.4.0/chart.umd.js',
+        'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js',
+    ),
+    'feather.js': VendorAsset(
+        'feather-icons-4.29.1/feather.min.js',
+        'https://cdn.jsdelivr.net/npm/feather-icons@4.29.1/dist/feather.min.js',
+    ),
+    'jquery.js': VendorAsset(
+        'jquery-3.4.1/jquery.slim.min.js',
+        'https://code.jquery.com/jquery-3.4.1.slim.min.js',
+        'sha384-J6qa4849blE2+poT4WnyKhv5vZF5SrPo0iEjwBvKU7imGFAV0wwj1yYfoRSJoZ+n',
+    ),
+    'summernote.css': VendorAsset(
+        'summernote-0.9.0/summernote-lite.min.css',
+        'https://cdn.jsdelivr.net/npm/summernote@0.9.0/dist/summernote-lite.min.css',
+    ),
+    'summernote.js': VendorAsset(
+        'summernote-0.9.0/summernote-lite.min.js',
+        'https://cdn.jsdelivr.net/npm/summernote@0.9.0/dist/summernote-lite.min.js',
+    ),
+}
+# 樣式表以相對路徑引用的檔案，只需下載，不直接出現在模板中
+VENDOR_FILES = [
+    VendorAsset(f'summernote-0.9.0/font/summernote.{extension}',
+                f'https://cdn.jsdelivr.net/npm/summernote@0.9.0/dist/font/summernote.{extension}')
+    for extension in ('eot', 'ttf', 'woff', 'woff2')
+]
+
+# 預先壓縮的副檔名與最小檔案大小（位元組）
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.map', '.eot', '.ttf'}
+COMPRESS_MIN_SIZE = 256
+# Accept-Encoding 與預先壓縮檔的副檔名，依優先順序
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def vendored_files():
+    """Every pinned vendor file, including those only referenced from stylesheets."""
+    return [*VENDOR_ASSETS.values(), *VENDOR_FILES]
+
+
+def missing_vendor_files():
+    """Static paths of pinned vendor files that no static files finder can locate."""
+    return [asset.path for asset in vendored_files() if finders.find(asset.path) is None]
+
+
+def sri(data):
+    """The ``sha384-...`` Subresource Integrity value of ``data``."""
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode('ascii')
+
+
+def download_vendor_assets(target_dir, force=False):
+    """
+    Download every pinned vendor file into ``target_dir`` (``accounts/static``).
+
+    Files that already exist are kept unless ``force`` is set. Pinned
+    integrity values are verified. Yields ``(asset, sri, downloaded)``.
+    """
+    for asset in vendored_files():
+        path = os.path.join(target_dir, *asset.path.split('/'))
+        if os.path.exists(path) and not force:
+            with open(path, 'rb') as existing:
+                yield asset, sri(existing.read()), False
+            continue
+        with urllib.request.urlopen(asset.url, timeout=30) as response:
+            data = response.read()
+        if asset.integrity and sri(data) != asset.integrity:
+            raise ValueError(f'{asset.url} does not match its pinned integrity {asset.integrity}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as output:
+            output.write(data)
+        yield asset, sri(data), True
+
+
+def compress_file(path):
+    """Write ``path.gz`` (and ``path.br`` when brotli is installed) next to ``path``."""
+    if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return []
+    variants = [(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((path + '.br', brotli.compress(data, quality=11)))
+    written = []
+    for variant_path, content in variants:
+        # 壓縮後沒有變小的版本不保留
+        if len(content) < len(data):
+            with open(variant_path, 'wb') as output:
+                output.write(content)
+            written.append(variant_path)
+    return written
+
+
+@lru_cache(maxsize=None)
+def _is_vendored(path):
+    if settings.DEBUG:
+        return finders.find(path) is not None
+    return staticfiles_storage.exists(path)
+
+
+def vendor_asset_url(name):
+    """
+    ``(url, integrity)`` of a vendor asset: the local static file once it
+    has been vendored, otherwise its pinned CDN URL (``check --deploy``
+    lists the assets still served from the CDN).
+    """
+    asset = VENDOR_ASSETS[name]
+    if _is_vendored(asset.path):
+        return staticfiles_storage.url(asset.path), asset.integrity
+    return asset.url, asset.integrity
+
+
+def precompressed_file(path, accept_encoding):
+    """
+    ``(file_path, encoding)`` of the smallest variant of ``path`` the client
+    accepts; ``encoding`` is ``None`` for the uncompressed file.
+    """
+    accepted = {value.split(';')[0].strip() for value in accept_encoding.split(',')}
+    for encoding, extension in ENCODINGS:
+        if encoding in accepted and os.path.exists(path + extension):
+            return path + extension, encoding
+    return path, None
+
+
+def content_type(path):
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or 'application/octet-stream'
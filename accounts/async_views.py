@@ -0,0 +1,131 @@
+"""
+Async-native versions of the read-only accounts views.
+
+These are routed instead of the sync views when ``ACCOUNTS_ASYNC_VIEWS`` is
+enabled (see README). Every query goes through the async ORM API, and the
+context is fully materialised before ``render()`` so templates never touch
+the database from the event loop.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+
+from .catalog import reference_data
+from .fragments import acached_fragment, request_vary_on
+from .hierarchy import tree_order
+from .models import Department, Employee, JobTitle
+from .pagination import KeysetPaginator
+from .search import search_employee_ids
+from .services import group_summaries
+from .views import (
+    DEPARTMENT_TABLE_DEPENDS_ON, EMPLOYEE_FILTERS_DEPENDS_ON, EMPLOYEE_PAGE_SIZE, EMPLOYEE_SEARCH_LIMIT,
+    EMPLOYEE_TABLE_DEPENDS_ON, EMPLOYEE_TYPEAHEAD_LIMIT, GROUP_TABLE_DEPENDS_ON, JOBTITLE_TABLE_DEPENDS_ON,
+    employee_bulk_context, employee_detail_data, employee_list_params, is_admin, typeahead_results,
+)
+
+
+def async_admin_required(view_func):
+    """Async equivalent of ``login_required`` + ``user_passes_test(is_admin)``."""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        # 以已載入的用戶取代 request.user，模板取用時不再同步查詢資料庫
+        request.user = user
+        if not (user.is_authenticated and is_admin(user)):
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+@async_admin_required
+async def group_list(request):
+    async def table_context():
+        return {'groups': [group async for group in group_summaries()]}
+
+    table = await acached_fragment(request, 'accounts/group_table.html', GROUP_TABLE_DEPENDS_ON, table_context)
+    return render(request, 'accounts/group_list.html', {'table': table})
+
+
+@async_admin_required
+async def department_list(request):
+    async def table_context():
+        departments = [department async for department in Department.objects.for_listing()]
+        return {'departments': tree_order(departments)}
+
+    table = await acached_fragment(request, 'accounts/department_table.html', DEPARTMENT_TABLE_DEPENDS_ON,
+                                   table_context)
+    return render(request, 'accounts/department_list.html', {'table': table})
+
+
+@async_admin_required
+async def jobtitle_list(request):
+    async def table_context():
+        return {'jobtitles': [jobtitle async for jobtitle in JobTitle.objects.for_listing()]}
+
+    table = await acached_fragment(request, 'accounts/jobtitle_table.html', JOBTITLE_TABLE_DEPENDS_ON,
+                                   table_context)
+    return render(request, 'accounts/jobtitle_list.html', {'table': table})
+
+
+@async_admin_required
+async def employee_list(request):
+    filters, query, sort, order_field = employee_list_params(request)
+
+    async def table_context():
+        # 部門篩選會先查詢是否為最下層部門，在執行緒中建立 queryset
+        employees = await sync_to_async(Employee.objects.filtered)(**filters)
+        if query:
+            employee_ids = await sync_to_async(search_employee_ids)(query, limit=EMPLOYEE_SEARCH_LIMIT)
+            employees = employees.filter(pk__in=employee_ids)
+        paginator = KeysetPaginator(employees.for_listing(), order_field, per_page=EMPLOYEE_PAGE_SIZE)
+        page = await paginator.apage(request.GET.get('cursor'))
+        return {'employees': page, 'page': page, 'sort': sort}
+
+    async def filters_context():
+        departments, job_titles = await sync_to_async(reference_data)('department', 'jobtitle')
+        return {
+            'filters': filters,
+            'query': query,
+            'sort': sort,
+            'departments': departments,
+            'job_titles': job_titles,
+            'gender_choices': Employee.GENDER_CHOICES,
+        }
+
+    return render(request, 'accounts/employee_list.html', {
+        'filters_form': await acached_fragment(
+            request, 'accounts/employee_filters.html', EMPLOYEE_FILTERS_DEPENDS_ON, filters_context,
+            vary_on=(sorted(filters.items()), query, sort),
+        ),
+        'table': await acached_fragment(
+            request, 'accounts/employee_table.html', EMPLOYEE_TABLE_DEPENDS_ON, table_context,
+            vary_on=request_vary_on(request),
+        ),
+        **await sync_to_async(employee_bulk_context)(filters, query),
+    })
+
+
+@async_admin_required
+async def employee_search(request):
+    query = request.GET.get('q', '').strip()
+    employee_ids = []
+    if query:
+        employee_ids = await sync_to_async(search_employee_ids)(query, limit=EMPLOYEE_TYPEAHEAD_LIMIT)
+    records = [record async for record in Employee.objects.filter(pk__in=employee_ids).for_listing()]
+    return JsonResponse({'results': typeahead_results(employee_ids, records)})
+
+
+@async_admin_required
+async def employee_detail(request, employee_id):
+    try:
+        employee = await (
+            Employee.objects.select_related('user', 'department', 'job_title').defer('bio')
+            .aget(id=employee_id)
+        )
+    except Employee.DoesNotExist:
+        raise Http404('No Employee matches the given query.')
+    return JsonResponse(employee_detail_data(employee))
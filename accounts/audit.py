@@ -0,0 +1,148 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+_request = ContextVar('accounts_audit_request', default=None)
+
+
+def _batch_size():
+    return getattr(settings, 'ACCOUNTS_AUDIT_BATCH_SIZE', 200)
+
+
+def _flush_interval():
+    return getattr(settings, 'ACCOUNTS_AUDIT_FLUSH_INTERVAL', 1.0)
+
+
+@contextmanager
+def acting_request(request):
+    """Make ``request.user`` the actor of every event recorded inside the block."""
+    token = _request.set(request)
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def _current_actor():
+    request = _request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    return None
+
+
+def audit_event(action, target_type, target_id=None, target_repr='', changes=None):
+    """An unsaved ``AuditEvent`` stamped with the current actor and time."""
+    actor = _current_actor()
+    return AuditEvent(
+        actor_id=actor.pk if actor else None,
+        actor_username=actor.username if actor else '',
+        action=action,
+        target_type=target_type,
+        target_id=target_id,
+        target_repr=str(target_repr)[:200],
+        changes=changes or {},
+    )
+
+
+def record_events(events):
+    """
+    Queue ``events`` for the background writer once the transaction commits.
+
+    Changes that are rolled back are never recorded, and the request never
+    waits for the audit table.
+    """
+    events = list(events)
+    if not events:
+        return
+
+    def enqueue():
+        _ensure_writer()
+        for event in events:
+            _queue.put(event)
+
+    transaction.on_commit(enqueue)
+
+
+def record(action, target_type, target_id=None, target_repr='', changes=None):
+    record_events([audit_event(action, target_type, target_id, target_repr, changes)])
+
+
+def diff(before, after):
+    """``{field: [old, new]}`` for every key whose value differs between two snapshots."""
+    return {field: [before.get(field), value] for field, value in after.items() if before.get(field) != value}
+
+
+def _write(events):
+    try:
+        close_old_connections()
+        AuditEvent.objects.bulk_create(events, batch_size=_batch_size())
+    except Exception:
+        logger.exception('Failed to write %d audit events', len(events))
+    finally:
+        close_old_connections()
+
+
+def _next_batch():
+    # 第一筆到達後，再等待最多 flush interval 秒湊滿一批
+    batch = [_queue.get()]
+    deadline = time.monotonic() + _flush_interval()
+    while len(batch) < _batch_size():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run_writer():
+    while True:
+        batch = _next_batch()
+        try:
+            _write(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name='audit-log-writer', daemon=True)
+            _writer.start()
+
+
+def flush_audit_log():
+    """Write every queued event now and wait for the batch in flight, e.g. on shutdown."""
+    pending = []
+    while True:
+        try:
+            pending.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if pending:
+        _write(pending)
+        for _ in pending:
+            _queue.task_done()
+    _queue.join()
+
+
+atexit.register(flush_audit_log)
@@ -0,0 +1,113 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import router
+
+from .fragments import acurrent_versions, bump_versions, current_versions
+
+# 群組權限或成員變動時遞增，所有用戶的快照一併失效
+AUTH_VERSION = 'auth'
+# 不放入快取的欄位
+SECRET_FIELDS = {'password'}
+# ModelBackend 解析權限後存在用戶物件上的屬性
+PERMISSION_CACHES = ('_user_perm_cache', '_group_perm_cache', '_perm_cache')
+
+
+def _cache():
+    # 與列表片段快取共用同一個快取，版本號才會一致
+    return caches[getattr(settings, 'ACCOUNTS_FRAGMENT_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'ACCOUNTS_AUTH_SNAPSHOT_TIMEOUT', 60 * 60)
+
+
+def user_version(user_id):
+    return f'user:{user_id}'
+
+
+def _snapshot_key(user_id):
+    return f'accounts:auth-user:{user_id}'
+
+
+def bump_user_versions(*user_ids):
+    """Drop the cached snapshots of ``user_ids`` once the current transaction commits."""
+    bump_versions(*(user_version(user_id) for user_id in user_ids))
+
+
+def bump_auth_version():
+    """Drop every cached snapshot, e.g. after a group's permissions or members change."""
+    bump_versions(AUTH_VERSION)
+
+
+def _session_auth_hash(user, cached_hash):
+    # 密碼欄位尚未載入時使用快照中的值；同一請求中改過密碼則重新計算
+    if 'password' in user.get_deferred_fields():
+        return cached_hash
+    return type(user).get_session_auth_hash(user)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that serves ``get_user()`` from a cached snapshot.
+
+    The snapshot holds the user's non-secret fields, the session auth hash
+    and the resolved permission sets, stored under the versions of that
+    user and of the shared auth data. While both versions are unchanged,
+    authenticating a request and checking ``has_perm`` run no queries. The
+    password hash is never cached: the rebuilt user has it deferred.
+    """
+
+    def _versions(self, versions):
+        return tuple(versions[name] for name in sorted(versions))
+
+    def _build(self, user_id):
+        user = super().get_user(user_id)
+        if user is None:
+            return None, None
+        # 預先解析權限，連同欄位值一起放入快照
+        self.get_all_permissions(user)
+        snapshot = {
+            'fields': {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields if field.attname not in SECRET_FIELDS
+            },
+            'session_auth_hash': user.get_session_auth_hash(),
+            'permissions': {name: getattr(user, name) for name in PERMISSION_CACHES if hasattr(user, name)},
+        }
+        return user, snapshot
+
+    def _restore(self, snapshot):
+        model = get_user_model()
+        fields = snapshot['fields']
+        user = model.from_db(router.db_for_read(model), list(fields), list(fields.values()))
+        user.get_session_auth_hash = partial(_session_auth_hash, user, snapshot['session_auth_hash'])
+        for name, value in snapshot['permissions'].items():
+            setattr(user, name, value)
+        return user
+
+    def get_user(self, user_id):
+        versions = self._versions(current_versions((AUTH_VERSION, user_version(user_id))))
+        cache = _cache()
+        cached = cache.get(_snapshot_key(user_id))
+        if cached is not None and cached[0] == versions:
+            return self._restore(cached[1])
+        user, snapshot = self._build(user_id)
+        if user is not None:
+            cache.set(_snapshot_key(user_id), (versions, snapshot), _timeout())
+        return user
+
+    async def aget_user(self, user_id):
+        versions = self._versions(await acurrent_versions((AUTH_VERSION, user_version(user_id))))
+        cache = _cache()
+        cached = await cache.aget(_snapshot_key(user_id))
+        if cached is not None and cached[0] == versions:
+            return self._restore(cached[1])
+        user, snapshot = await sync_to_async(self._build)(user_id)
+        if user is not None:
+            await cache.aset(_snapshot_key(user_id), (versions, snapshot), _timeout())
+        return user
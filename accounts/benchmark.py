@@ -0,0 +1,333 @@
+import statistics
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from .models import Department, Employee, JobTitle
+from .pagination import KeysetPaginator
+from .services import add_group_members, reassign_employees, remove_group_members
+
+BENCHMARK_USERNAME = 'benchmark-admin'
+BENCHMARK_PREFIX = 'bench-'
+# 基準測試建立的身份證號序號從此開始，不與 seed_company 產生的號碼重複
+BENCHMARK_SERIAL_START = 90000000
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Case:
+    """
+    One timed request. ``path`` and ``data`` may be callables taking the
+    iteration number; ``setup`` and ``cleanup`` run untimed around each
+    request so that write cases leave the data as they found it.
+    """
+
+    def __init__(self, name, path, method='get', data=None, setup=None, cleanup=None):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.setup = setup
+        self.cleanup = cleanup
+
+    def resolve(self, value, iteration):
+        return value(iteration) if callable(value) else value
+
+
+def _percentile(values, percent):
+    # nearest-rank
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def _summary(latencies, queries):
+    latencies = sorted(latencies)
+    summary = {'latency_ms': {}, 'queries': {'min': min(queries), 'max': max(queries)}}
+    for percent in PERCENTILES:
+        summary['latency_ms'][f'p{percent}'] = round(_percentile(latencies, percent) * 1000, 2)
+    summary['latency_ms']['max'] = round(latencies[-1] * 1000, 2)
+    summary['latency_ms']['mean'] = round(statistics.fmean(latencies) * 1000, 2)
+    return summary
+
+
+def _middle(queryset):
+    count = queryset.count()
+    return queryset.order_by('pk')[count // 2] if count else None
+
+
+def _employee_post_data(employee):
+    return {
+        'email': employee.user.email,
+        'first_name': employee.user.first_name,
+        'last_name': employee.user.last_name,
+        'id_number': employee.id_number,
+        'gender': employee.gender,
+        'birth_date': employee.birth_date.isoformat() if employee.birth_date else '',
+        'bio': employee.bio or '',
+        'department': employee.department_id or '',
+        'job_title': employee.job_title_id or '',
+    }
+
+
+def _new_employee_data(iteration):
+    return {
+        'username': f'{BENCHMARK_PREFIX}employee-{iteration}',
+        'password': 'benchmark-password',
+        'first_name': '測試',
+        'last_name': '王',
+        'id_number': f'Z1{BENCHMARK_SERIAL_START + iteration:08d}',
+        'gender': 'M',
+    }
+
+
+def _import_file(iteration):
+    lines = ['username,id_number,gender,first_name,last_name']
+    for index in range(10):
+        lines.append(f'{BENCHMARK_PREFIX}import-{iteration}-{index},Y2{BENCHMARK_SERIAL_START + iteration * 10 + index:08d},F,匯入,李')
+    return SimpleUploadedFile('employees.csv', '\n'.join(lines).encode('utf-8'), content_type='text/csv')
+
+
+def _delete_benchmark_users():
+    User.objects.filter(username__startswith=BENCHMARK_PREFIX).delete()
+
+
+def build_cases():
+    """Every route in ``accounts/urls.py`` against representative rows of the current data."""
+    employee = _middle(Employee.objects.select_related('user'))
+    department = _middle(Department.objects.all())
+    job_title = _middle(JobTitle.objects.all())
+    group = _middle(Group.objects.all())
+    if not all([employee, department, job_title, group]):
+        raise ValueError('資料庫中沒有員工、部門、職稱或群組，請先執行 seed_company')
+
+    user = employee.user
+    user_permission_ids = list(user.user_permissions.values_list('id', flat=True))
+    user_group_ids = list(user.groups.values_list('id', flat=True))
+    extra_permission = Permission.objects.exclude(id__in=user_permission_ids).order_by('id').first()
+    group_permission_ids = list(group.permissions.values_list('id', flat=True))
+    outsiders = list(User.objects.exclude(groups=group).order_by('pk').values_list('id', flat=True)[:20])
+    department_outsiders = list(
+        Employee.objects.filter(department=department).exclude(user__groups=group)
+        .values_list('user_id', flat=True)
+    )
+    first_page = KeysetPaginator(Employee.objects.for_listing(), 'id').page(None)
+    other_job_title = JobTitle.objects.exclude(pk=job_title.pk).order_by('pk').first() or job_title
+    department_job_titles = list(Employee.objects.filter(department=department).values_list('pk', 'job_title_id'))
+
+    user_permissions_data = {
+        'permissions': user_permission_ids, 'groups': user_group_ids,
+        **({'is_staff': 'on'} if user.is_staff else {}),
+        **({'is_superuser': 'on'} if user.is_superuser else {}),
+    }
+
+    def url(name, *args):
+        return reverse(name, args=args)
+
+    def restore_job_titles(iteration):
+        by_job_title = {}
+        for employee_id, job_title_id in department_job_titles:
+            by_job_title.setdefault(job_title_id, []).append(employee_id)
+        for job_title_id, employee_ids in by_job_title.items():
+            if job_title_id is not None:
+                reassign_employees(Employee.objects.filter(pk__in=employee_ids), 'job_title',
+                                   JobTitle.objects.get(pk=job_title_id))
+
+    def create_group(iteration):
+        Group.objects.create(name=f'{BENCHMARK_PREFIX}delete-{iteration}')
+
+    def delete_group_url(iteration):
+        return url('group_delete', Group.objects.get(name=f'{BENCHMARK_PREFIX}delete-{iteration}').id)
+
+    def create_department(iteration):
+        Department.objects.create(name=f'{BENCHMARK_PREFIX}delete-{iteration}')
+
+    def delete_department_url(iteration):
+        return url('department_delete', Department.objects.get(name=f'{BENCHMARK_PREFIX}delete-{iteration}').id)
+
+    def create_job_title(iteration):
+        JobTitle.objects.create(name=f'{BENCHMARK_PREFIX}delete-{iteration}')
+
+    def delete_job_title_url(iteration):
+        return url('jobtitle_delete', JobTitle.objects.get(name=f'{BENCHMARK_PREFIX}delete-{iteration}').id)
+
+    def create_employee(iteration):
+        new_user = User.objects.create(username=f'{BENCHMARK_PREFIX}delete-{iteration}')
+        Employee.objects.create(user=new_user, id_number=f'X1{BENCHMARK_SERIAL_START + iteration:08d}', gender='F')
+
+    def delete_employee_url(iteration):
+        return url('employee_delete', Employee.objects.get(user__username=f'{BENCHMARK_PREFIX}delete-{iteration}').id)
+
+    return [
+        Case('signup GET', url('signup')),
+        Case('permissions_panel GET', url('permissions_panel')),
+        Case('user_permissions GET', url('user_permissions', user.id)),
+        Case('user_permissions POST unchanged', url('user_permissions', user.id), 'post', user_permissions_data),
+        Case('user_permissions POST grant', url('user_permissions', user.id), 'post',
+             {**user_permissions_data, 'permissions': user_permission_ids + [extra_permission.id]},
+             cleanup=lambda i: user.user_permissions.remove(extra_permission)),
+        Case('audit_log GET', url('audit_log')),
+        Case('audit_log GET actor', f'{url("audit_log")}?actor={BENCHMARK_USERNAME}'),
+        Case('analytics_dashboard GET', url('analytics_dashboard')),
+        Case('group_list GET', url('group_list')),
+        Case('group_create GET', url('group_create')),
+        Case('group_create POST', url('group_create'), 'post',
+             lambda i: {'name': f'{BENCHMARK_PREFIX}create-{i}'},
+             cleanup=lambda i: Group.objects.filter(name=f'{BENCHMARK_PREFIX}create-{i}').delete()),
+        Case('group_edit GET', url('group_edit', group.id)),
+        Case('group_edit POST', url('group_edit', group.id), 'post', {'name': group.name}),
+        Case('group_delete GET', url('group_delete', group.id)),
+        Case('group_delete POST', delete_group_url, 'post', setup=create_group),
+        Case('group_permissions GET', url('group_permissions', group.id)),
+        Case('group_permissions POST unchanged', url('group_permissions', group.id), 'post',
+             {'permissions': group_permission_ids}),
+        Case('group_permissions POST change', url('group_permissions', group.id), 'post',
+             {'permissions': group_permission_ids[1:] + [extra_permission.id]},
+             cleanup=lambda i: group.permissions.set(group_permission_ids)),
+        Case('group_members GET', url('group_members', group.id)),
+        Case('group_members POST add', url('group_members', group.id), 'post',
+             {'action': 'add', 'users': outsiders},
+             cleanup=lambda i: remove_group_members(group, outsiders)),
+        Case('group_members POST remove', url('group_members', group.id), 'post',
+             {'action': 'remove', 'users': outsiders},
+             setup=lambda i: add_group_members(group, outsiders)),
+        Case('group_members POST add_employees', url('group_members', group.id), 'post',
+             {'action': 'add_employees', 'department': department.id},
+             cleanup=lambda i: remove_group_members(group, department_outsiders)),
+        Case('department_list GET', url('department_list')),
+        Case('department_export GET', url('department_export')),
+        Case('department_create GET', url('department_create')),
+        Case('department_create POST', url('department_create'), 'post',
+             lambda i: {'name': f'{BENCHMARK_PREFIX}create-{i}', 'description': ''},
+             cleanup=lambda i: Department.objects.filter(name=f'{BENCHMARK_PREFIX}create-{i}').delete()),
+        Case('department_edit GET', url('department_edit', department.id)),
+        Case('department_edit POST', url('department_edit', department.id), 'post',
+             {'name': department.name, 'description': department.description or ''}),
+        Case('department_delete GET', url('department_delete', department.id)),
+        Case('department_delete POST', delete_department_url, 'post', setup=create_department),
+        Case('jobtitle_list GET', url('jobtitle_list')),
+        Case('jobtitle_export GET', url('jobtitle_export')),
+        Case('jobtitle_create GET', url('jobtitle_create')),
+        Case('jobtitle_create POST', url('jobtitle_create'), 'post',
+             lambda i: {'name': f'{BENCHMARK_PREFIX}create-{i}', 'description': '', 'level': 1},
+             cleanup=lambda i: JobTitle.objects.filter(name=f'{BENCHMARK_PREFIX}create-{i}').delete()),
+        Case('jobtitle_edit GET', url('jobtitle_edit', job_title.id)),
+        Case('jobtitle_edit POST', url('jobtitle_edit', job_title.id), 'post',
+             {'name': job_title.name, 'description': job_title.description or '', 'level': job_title.level}),
+        Case('jobtitle_delete GET', url('jobtitle_delete', job_title.id)),
+        Case('jobtitle_delete POST', delete_job_title_url, 'post', setup=create_job_title),
+        Case('employee_list GET', url('employee_list')),
+        Case('employee_list GET next page', f'{url("employee_list")}?cursor={first_page.next_cursor or ""}'),
+        Case('employee_list GET department', f'{url("employee_list")}?department={department.id}'),
+        Case('employee_list GET sorted', f'{url("employee_list")}?sort=id_number'),
+        Case('employee_list GET search', f'{url("employee_list")}?q={user.last_name}'),
+        Case('employee_search GET', f'{url("employee_search")}?q={user.username}'),
+        Case('employee_detail GET', url('employee_detail', employee.id)),
+        Case('employee_export GET', f'{url("employee_export")}?department={department.id}'),
+        Case('employee_import GET', url('employee_import')),
+        Case('employee_import POST', url('employee_import'), 'post', lambda i: {'file': _import_file(i)},
+             cleanup=lambda i: _delete_benchmark_users()),
+        Case('employee_create GET', url('employee_create')),
+        Case('employee_create POST', url('employee_create'), 'post', _new_employee_data,
+             cleanup=lambda i: _delete_benchmark_users()),
+        Case('employee_bulk POST preview', url('employee_bulk'), 'post',
+             {'action': 'job_title', 'job_title_target': other_job_title.id, 'scope': 'filtered',
+              'department': department.id}),
+        Case('employee_bulk POST job_title', url('employee_bulk'), 'post',
+             {'action': 'job_title', 'job_title_target': other_job_title.id, 'scope': 'filtered',
+              'department': department.id, 'confirm': '1'},
+             cleanup=restore_job_titles),
+        Case('employee_edit GET', url('employee_edit', employee.id)),
+        Case('employee_edit POST', url('employee_edit', employee.id), 'post', _employee_post_data(employee)),
+        Case('employee_delete GET', url('employee_delete', employee.id)),
+        Case('employee_delete POST', delete_employee_url, 'post', setup=create_employee),
+    ]
+
+
+def benchmark_admin():
+    admin, created = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME, defaults={'is_staff': True, 'is_superuser': True},
+    )
+    if created:
+        admin.set_unusable_password()
+        admin.save(update_fields=['password'])
+    return admin
+
+
+def run_benchmark(iterations=20, host='localhost', cases=None, progress=None):
+    """
+    Time every case ``iterations`` times (after one warm-up request).
+
+    Query counts come from the recorder ``RequestMetricsMiddleware``
+    attaches to each response, read after streaming bodies are consumed. Returns a JSON-serialisable report.
+    """
+    client = Client(HTTP_HOST=host)
+    client.force_login(benchmark_admin())
+    cases = cases if cases is not None else build_cases()
+
+    results = {}
+    for case in cases:
+        latencies, queries, status = [], [], None
+        for iteration in range(iterations + 1):
+            if case.setup:
+                case.setup(iteration)
+            path = case.resolve(case.path, iteration)
+            data = case.resolve(case.data, iteration)
+
+            started = time.perf_counter()
+            response = getattr(client, case.method)(path, data)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+
+            if case.cleanup:
+                case.cleanup(iteration)
+            status = response.status_code
+            if iteration == 0:
+                continue
+            latencies.append(elapsed)
+            metrics = getattr(response, 'request_metrics', None)
+            queries.append(metrics.queries if metrics is not None else -1)
+
+        results[case.name] = {
+            'method': case.method.upper(),
+            'path': path,
+            'status': status,
+            **_summary(latencies, queries),
+        }
+        if progress:
+            progress(case.name, results[case.name])
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'iterations': iterations,
+            'database': connection.vendor,
+            'db_profile': getattr(settings, 'DB_PROFILE', 'development'),
+            'async_views': settings.ACCOUNTS_ASYNC_VIEWS,
+            'employees': Employee.objects.count(),
+            'users': User.objects.count(),
+            'departments': Department.objects.count(),
+            'job_titles': JobTitle.objects.count(),
+            'groups': Group.objects.count(),
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current):
+    """Yield ``(case, old_p50, new_p50, old_queries, new_queries)`` for cases in both reports."""
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        yield (
+            name,
+            previous['latency_ms']['p50'], result['latency_ms']['p50'],
+            previous['queries']['max'], result['queries']['max'],
+        )
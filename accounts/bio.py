@@ -0,0 +1,116 @@
+import base64
+import binascii
+import hashlib
+import html
+import io
+import re
+
+import bleach
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.text import Truncator
+
+# 與 Summernote 工具列相符的白名單
+BIO_ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'div', 'em', 'font', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 'span', 'strong', 'table', 'tbody', 'td',
+    'th', 'thead', 'tr', 'u', 'ul',
+}
+BIO_ALLOWED_ATTRIBUTES = {
+    '*': ['style'],
+    'a': ['href', 'title', 'target'],
+    'font': ['color', 'face'],
+    'img': ['src', 'alt', 'width', 'height'],
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan'],
+}
+BIO_ALLOWED_STYLES = [
+    'background-color', 'color', 'float', 'font-family', 'font-size', 'font-weight',
+    'height', 'line-height', 'text-align', 'text-decoration', 'width',
+]
+BIO_EXCERPT_LENGTH = 200
+BIO_IMAGES_DIR = 'employee_bio_images'
+
+_INLINE_IMAGE = re.compile(
+    r'''(?P<quote>["'])data:image/(?P<type>png|jpe?g|gif|webp);base64,(?P<data>[A-Za-z0-9+/=\s]+)(?P=quote)''',
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r'\s+')
+# bleach 的 strip 只移除標籤本身，script/style 的內容需先整段刪除
+_DROPPED_BLOCKS = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_BLOCK_BOUNDARY = re.compile(r'<(?:br|/?(?:p|div|li|h[1-6]|td|th|tr|blockquote|pre))\b[^>]*>', re.IGNORECASE)
+
+
+def _css_sanitizer():
+    # 需要 tinycss2；未安裝時直接移除 style 屬性
+    try:
+        from bleach.css_sanitizer import CSSSanitizer
+        return CSSSanitizer(allowed_css_properties=BIO_ALLOWED_STYLES)
+    except ImportError:
+        return None
+
+
+_CSS_SANITIZER = _css_sanitizer()
+
+
+def _store_inline_image(match):
+    try:
+        data = base64.b64decode(match.group('data'), validate=False)
+    except (binascii.Error, ValueError):
+        return match.group(0)
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception:
+        # 無法辨識的影像保留原樣，稍後由 sanitizer 移除
+        return match.group(0)
+
+    extension = match.group('type').lower().replace('jpeg', 'jpg')
+    digest = hashlib.sha256(data).hexdigest()
+    name = f'{BIO_IMAGES_DIR}/{digest[:2]}/{digest}.{extension}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    quote = match.group('quote')
+    return f'{quote}{default_storage.url(name)}{quote}'
+
+
+def extract_inline_images(value):
+    """Move base64 ``data:`` images into media files and point ``src`` at them."""
+    if not value or 'data:image/' not in value:
+        return value
+    return _INLINE_IMAGE.sub(_store_inline_image, value)
+
+
+def sanitize_bio(value):
+    attributes = BIO_ALLOWED_ATTRIBUTES
+    if _CSS_SANITIZER is None:
+        attributes = {tag: [name for name in names if name != 'style'] for tag, names in attributes.items()}
+    return bleach.clean(
+        _DROPPED_BLOCKS.sub('', value),
+        tags=BIO_ALLOWED_TAGS,
+        attributes=attributes,
+        css_sanitizer=_CSS_SANITIZER,
+        strip=True,
+    ).strip()
+
+
+def bio_excerpt(value, length=BIO_EXCERPT_LENGTH):
+    text = bleach.clean(_BLOCK_BOUNDARY.sub(' ', value), tags=set(), strip=True)
+    text = _WHITESPACE.sub(' ', html.unescape(text)).strip()
+    return Truncator(text).chars(length)
+
+
+def process_bio(value):
+    """
+    Return ``(bio, bio_html, bio_excerpt)`` for the raw Summernote HTML.
+
+    ``bio`` keeps the editable source with inline images replaced by media
+    URLs, ``bio_html`` is the sanitised markup that is safe to render, and
+    ``bio_excerpt`` is a short plain-text summary for list pages.
+    """
+    if not value:
+        return value, '', ''
+    value = extract_inline_images(value)
+    rendered = sanitize_bio(value)
+    return value, rendered, bio_excerpt(rendered)
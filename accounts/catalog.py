@@ -0,0 +1,111 @@
+import threading
+from collections import namedtuple
+
+from django.contrib.auth.models import Group, Permission
+
+from .fragments import bump_versions, current_versions
+from .models import Department, JobTitle
+from .services import _count_subquery
+
+PermissionEntry = namedtuple('PermissionEntry', ['id', 'name', 'codename'])
+Choice = namedtuple('Choice', ['id', 'name'])
+GroupChoice = namedtuple('GroupChoice', ['id', 'name', 'permission_count'])
+
+
+def _build_permission_tree():
+    tree = []
+    rows = (
+        Permission.objects
+        .order_by('content_type__app_label', 'content_type__model', 'codename')
+        .values_list('content_type__app_label', 'content_type__model', 'id', 'name', 'codename')
+    )
+    for app_label, model, permission_id, name, codename in rows:
+        if not tree or tree[-1][0] != app_label:
+            tree.append((app_label, []))
+        models = tree[-1][1]
+        if not models or models[-1][0] != model:
+            models.append((model, []))
+        models[-1][1].append(PermissionEntry(permission_id, name, codename))
+    return tuple(
+        (app_label, tuple((model, tuple(entries)) for model, entries in models))
+        for app_label, models in tree
+    )
+
+
+def _build_departments():
+    return tuple(Choice(*row) for row in Department.objects.values_list('id', 'name'))
+
+
+def _build_job_titles():
+    return tuple(Choice(*row) for row in JobTitle.objects.values_list('id', 'name'))
+
+
+def _build_groups():
+    # 只需要權限數；成員數的子查詢在大量用戶時很慢
+    rows = (
+        Group.objects
+        .annotate(permission_count=_count_subquery(Group.permissions.through, 'group_id'))
+        .order_by('name')
+        .values_list('id', 'name', 'permission_count')
+    )
+    return tuple(GroupChoice(*row) for row in rows)
+
+
+class ReferenceTable:
+    """
+    A small, rarely changing table kept in memory for the life of the process.
+
+    ``get(version)`` returns the cached rows while ``version`` matches the
+    one they were built under, and rebuilds them with one query otherwise.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._lock = threading.Lock()
+        self._entry = (None, None)
+
+    def get(self, version):
+        built_under, rows = self._entry
+        if built_under != version:
+            with self._lock:
+                built_under, rows = self._entry
+                if built_under != version:
+                    rows = self.build()
+                    self._entry = (version, rows)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entry = (None, None)
+
+
+# 名稱與 accounts.fragments 的版本號共用，資料變動時由 signals 遞增
+REFERENCE_TABLES = {
+    'department': ReferenceTable(_build_departments),
+    'jobtitle': ReferenceTable(_build_job_titles),
+    'group': ReferenceTable(_build_groups),
+    'permission': ReferenceTable(_build_permission_tree),
+}
+
+
+def reference_data(*names):
+    """
+    The cached rows of each reference table in ``names``, in order.
+
+    The shared versions of all tables are read with one cache round trip, so
+    changes made by other workers are picked up on the next request.
+    """
+    versions = current_versions(names)
+    return [REFERENCE_TABLES[name].get(versions[name]) for name in names]
+
+
+def permission_tree():
+    """The app -> model -> permission tree used by the permission editors."""
+    tree, = reference_data('permission')
+    return tree
+
+
+def invalidate_permission_tree(**kwargs):
+    # 本行程立即重建，其他 worker 在交易提交後依版本號重建
+    REFERENCE_TABLES['permission'].clear()
+    bump_versions('permission')
@@ -0,0 +1,16 @@
+from django.core.checks import Tags, Warning, register
+
+from .assets import missing_vendor_files
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendor_assets(app_configs, **kwargs):
+    """``check --deploy`` lists pinned vendor files still served from the CDN."""
+    return [
+        Warning(
+            f'找不到第三方靜態檔案 {path}，頁面暫時改用固定版本的 CDN 網址',
+            hint='執行 python manage.py vendor_assets 下載固定版本的檔案並提交。',
+            id='accounts.W001',
+        )
+        for path in missing_vendor_files()
+    ]
@@ -0,0 +1,182 @@
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from .models import Department, Employee, JobTitle
+
+EXPORT_CHUNK_SIZE = 2000
+# 試算表會把這些字元開頭的儲存格當成公式執行，匯出時前面加上單引號
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Dataset:
+    def __init__(self, name, columns, lookups, queryset):
+        self.name = name
+        self.columns = columns
+        self.lookups = lookups
+        self.queryset = queryset
+
+    def rows(self, queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+        # 以 iterator() 分批讀取，記憶體用量與資料量無關
+        queryset = self.queryset() if queryset is None else queryset
+        return queryset.order_by('pk').values_list(*self.lookups).iterator(chunk_size=chunk_size)
+
+
+DATASETS = {
+    'employees': Dataset(
+        'employees',
+        ('username', 'email', 'first_name', 'last_name', 'id_number', 'gender',
+         'birth_date', 'department', 'job_title'),
+        ('user__username', 'user__email', 'user__first_name', 'user__last_name', 'id_number',
+         'gender', 'birth_date', 'department__name', 'job_title__name'),
+        lambda: Employee.objects.all(),
+    ),
+    'departments': Dataset(
+        'departments',
+        ('name', 'parent', 'description', 'created_at'),
+        ('name', 'parent__name', 'description', 'created_at'),
+        lambda: Department.objects.all(),
+    ),
+    'jobtitles': Dataset(
+        'jobtitles',
+        ('name', 'level', 'description', 'created_at'),
+        ('name', 'level', 'description', 'created_at'),
+        lambda: JobTitle.objects.all(),
+    ),
+}
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _cell(value):
+    # 使用者輸入的文字可能是公式，例如 =HYPERLINK(...)；數字與日期不受影響
+    text = _text(value)
+    if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows):
+    """Yield CSV lines one at a time, starting with a UTF-8 BOM for Excel."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+class _ChunkBuffer:
+    # 不可 seek 的輸出緩衝，zipfile 會改用 data descriptor 逐段寫出
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_STATIC_PARTS = (
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/workbook.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+     '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '</Relationships>'),
+)
+
+
+_XML_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            text = escape(_XML_INVALID_CHARS.sub('', _cell(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def stream_xlsx(columns, rows, flush_every=500):
+    """
+    Yield an XLSX workbook as it is written.
+
+    The single worksheet uses inline strings, so no shared-string table has
+    to be held in memory, and the zip is emitted with data descriptors so
+    bytes can be sent before the last row is read.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS:
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(columns).encode('utf-8'))
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode('utf-8'))
+                if count % flush_every == 0:
+                    chunk = buffer.drain()
+                    if chunk:
+                        yield chunk
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', stream_xlsx),
+}
@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# 片段快取的版本號名稱，對應會影響列表內容的模型
+VERSIONED_MODELS = ('department', 'jobtitle', 'employee', 'user', 'group')
+
+
+def _cache():
+    return caches[getattr(settings, 'ACCOUNTS_FRAGMENT_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'ACCOUNTS_FRAGMENT_TIMEOUT', 24 * 60 * 60)
+
+
+def _version_key(name):
+    return f'accounts:version:{name}'
+
+
+def _fresh_version():
+    # 版本號遺失（快取清除或重啟）時從目前時間重新開始，不會與舊片段的鍵重複
+    return time.time_ns()
+
+
+def _bump(names):
+    cache = _cache()
+    for name in names:
+        try:
+            cache.incr(_version_key(name))
+        except ValueError:
+            cache.add(_version_key(name), _fresh_version(), timeout=None)
+
+
+def bump_versions(*names):
+    """
+    Invalidate every fragment that depends on ``names`` once the current
+    transaction commits, so no reader can cache pre-commit rows under the
+    new version.
+    """
+    transaction.on_commit(lambda: _bump(names))
+
+
+def current_versions(names):
+    """The shared version of each name in ``names``, read with one cache round trip."""
+    cache = _cache()
+    found = cache.get_many([_version_key(name) for name in names])
+    versions = {}
+    for name in names:
+        key = _version_key(name)
+        if key not in found:
+            cache.add(key, _fresh_version(), timeout=None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+async def acurrent_versions(names):
+    """Async ``current_versions``."""
+    cache = _cache()
+    found = await cache.aget_many([_version_key(name) for name in names])
+    versions = {}
+    for name in names:
+        key = _version_key(name)
+        if key not in found:
+            await cache.aadd(key, _fresh_version(), timeout=None)
+            found[key] = await cache.aget(key)
+        versions[name] = found[key]
+    return versions
+
+
+def _fragment_key(template_name, versions, vary_on):
+    parts = [template_name, *(f'{name}={versions[name]}' for name in sorted(versions)), *map(str, vary_on)]
+    digest = hashlib.md5('\n'.join(parts).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return f'accounts:fragment:{digest}'
+
+
+def request_vary_on(request):
+    """Query parameters in a stable order, for fragments that render them into links."""
+    return sorted((key, tuple(values)) for key, values in request.GET.lists())
+
+
+def cached_fragment(request, template_name, depends_on, get_context, vary_on=()):
+    """
+    Render ``template_name`` with ``get_context()`` or return the cached HTML.
+
+    The cache key combines the current versions of the ``depends_on`` models
+    with ``vary_on``, so ``get_context`` (and its queries) only runs on a miss.
+    """
+    cache = _cache()
+    key = _fragment_key(template_name, current_versions(depends_on), vary_on)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, get_context(), request=request)
+        cache.set(key, html, _timeout())
+    return mark_safe(html)
+
+
+async def acached_fragment(request, template_name, depends_on, get_context, vary_on=()):
+    """Async ``cached_fragment``; ``get_context`` is a coroutine function."""
+    cache = _cache()
+    key = _fragment_key(template_name, await acurrent_versions(depends_on), vary_on)
+    html = await cache.aget(key)
+    if html is None:
+        html = render_to_string(template_name, await get_context(), request=request)
+        await cache.aset(key, html, _timeout())
+    return mark_safe(html)
@@ -0,0 +1,128 @@
+from django.db import connection, transaction
+
+from .models import Department, DepartmentClosure
+
+
+class HierarchyError(ValueError):
+    pass
+
+
+def _table_names():
+    return DepartmentClosure._meta.db_table, Department._meta.db_table
+
+
+def insert_department(department):
+    """Add the closure rows of a new department: itself plus its parent's ancestors."""
+    closure, _ = _table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {closure} (ancestor_id, descendant_id, depth) VALUES (%s, %s, 0)',
+            [department.pk, department.pk],
+        )
+        if department.parent_id is not None:
+            cursor.execute(
+                f'INSERT INTO {closure} (ancestor_id, descendant_id, depth) '
+                f'SELECT ancestor_id, %s, depth + 1 FROM {closure} WHERE descendant_id = %s',
+                [department.pk, department.parent_id],
+            )
+
+
+def detach_subtree(department):
+    """Cut every link between ``department``'s subtree and the ancestors above it."""
+    closure, _ = _table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {closure} '
+            f'WHERE descendant_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = %s) '
+            f'AND ancestor_id IN (SELECT ancestor_id FROM {closure} WHERE descendant_id = %s AND depth > 0)',
+            [department.pk, department.pk],
+        )
+
+
+def detach_children(department):
+    """Make the children of ``department`` roots, before it is deleted."""
+    closure, _ = _table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {closure} '
+            f'WHERE descendant_id IN (SELECT descendant_id FROM {closure} WHERE ancestor_id = %s AND depth > 0) '
+            f'AND ancestor_id IN (SELECT ancestor_id FROM {closure} WHERE descendant_id = %s)',
+            [department.pk, department.pk],
+        )
+
+
+def move_department(department):
+    """Re-link ``department``'s subtree under its current ``parent_id``."""
+    closure, _ = _table_names()
+    with transaction.atomic():
+        detach_subtree(department)
+        if department.parent_id is None:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {closure} (ancestor_id, descendant_id, depth) '
+                f'SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1 '
+                f'FROM {closure} above, {closure} below '
+                f'WHERE above.descendant_id = %s AND below.ancestor_id = %s',
+                [department.parent_id, department.pk],
+            )
+
+
+def sync_department(department, created=False):
+    """Bring the closure table in line with ``department.parent_id`` after a save."""
+    if created:
+        insert_department(department)
+        return
+    linked_parent = (
+        DepartmentClosure.objects
+        .filter(descendant_id=department.pk, depth=1)
+        .values_list('ancestor_id', flat=True)
+        .first()
+    )
+    if linked_parent != department.parent_id:
+        move_department(department)
+
+
+def validate_parent(department, parent_id):
+    """Raise ``HierarchyError`` if ``parent_id`` would put ``department`` inside its own subtree."""
+    if department.pk is None or parent_id is None:
+        return
+    if Department.objects.subtree(department.pk).filter(pk=parent_id).exists():
+        raise HierarchyError(f'部門 "{department.name}" 不能移到自己或其下層部門之下')
+
+
+def rebuild_closure():
+    """Recompute the whole closure table from ``parent_id`` with one recursive query."""
+    closure, departments = _table_names()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {closure}')
+        cursor.execute(
+            f'INSERT INTO {closure} (ancestor_id, descendant_id, depth) '
+            f'WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS ('
+            f'  SELECT id, id, 0 FROM {departments}'
+            f'  UNION ALL'
+            f'  SELECT tree.ancestor_id, child.id, tree.depth + 1'
+            f'  FROM tree JOIN {departments} child ON child.parent_id = tree.descendant_id'
+            f') SELECT ancestor_id, descendant_id, depth FROM tree'
+        )
+
+
+def tree_order(departments):
+    """
+    ``departments`` (ordered by name) rearranged depth-first, children under
+    their parent. Rows whose parent is not in the list are treated as roots.
+    """
+    departments = list(departments)
+    ids = {department.id for department in departments}
+    children = {}
+    for department in departments:
+        parent_id = department.parent_id if department.parent_id in ids else None
+        children.setdefault(parent_id, []).append(department)
+
+    ordered = []
+    stack = list(reversed(children.get(None, [])))
+    while stack:
+        department = stack.pop()
+        ordered.append(department)
+        stack.extend(reversed(children.get(department.id, [])))
+    return ordered
@@ -0,0 +1,280 @@
+import csv
+import io
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .analytics import COUNTED_FIELDS, adjust_snapshot
+from .fragments import bump_versions
+from .models import Department, Employee, JobTitle
+from .search import index_employees
+
+IMPORT_COLUMNS = (
+    'username', 'password', 'email', 'first_name', 'last_name',
+    'id_number', 'gender', 'birth_date', 'department', 'job_title',
+)
+IMPORT_BATCH_SIZE = 1000
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def read_rows(fileobj, filename):
+    """Yield ``(line, row_dict)`` from a CSV or XLSX upload without loading it all."""
+    if filename.lower().endswith('.xlsx'):
+        yield from _read_xlsx(fileobj)
+    else:
+        yield from _read_csv(fileobj)
+
+
+def _read_csv(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    for line, row in enumerate(csv.DictReader(text), start=2):
+        yield line, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+
+def _read_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('匯入 XLSX 檔案需要安裝 openpyxl')
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            row = {}
+            for key, value in zip(header, values):
+                if not key:
+                    continue
+                if isinstance(value, (date, datetime)):
+                    row[key] = value
+                else:
+                    row[key] = '' if value is None else str(value).strip()
+            if any(row.values()):
+                yield line, row
+    finally:
+        workbook.close()
+
+
+def _hash_passwords(passwords, executor):
+    # 無密碼的帳號設為不可用密碼，不需耗費雜湊運算
+    hashed = [make_password(None)] * len(passwords)
+    pending = [(index, password) for index, password in enumerate(passwords) if password]
+    if not pending:
+        return hashed
+    if executor is None:
+        results = map(make_password, (password for _, password in pending))
+    else:
+        results = executor.map(make_password, (password for _, password in pending), chunksize=64)
+    for (index, _), value in zip(pending, results):
+        hashed[index] = value
+    return hashed
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+class EmployeeImporter:
+    """
+    Validate and bulk-insert employees from an iterable of ``(line, row)``.
+
+    Rows are handled in batches: one lookup per batch for existing usernames
+    and ID numbers, one ``bulk_create`` for users and one for employees.
+    Department and job title names are resolved once up front, and password
+    hashing moves to a process pool of at most ``ACCOUNTS_IMPORT_MAX_WORKERS``
+    once more than ``process_threshold`` rows have been read, so small
+    uploads never start processes.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, workers=None, process_threshold=None):
+        self.batch_size = batch_size
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.workers = min(workers, settings.ACCOUNTS_IMPORT_MAX_WORKERS)
+        self.process_threshold = (
+            process_threshold if process_threshold is not None else settings.ACCOUNTS_IMPORT_PROCESS_THRESHOLD
+        )
+        self.id_number_regex = next(
+            validator.regex for validator in Employee._meta.get_field('id_number').validators
+            if hasattr(validator, 'regex')
+        )
+        self.genders = {}
+        for code, label in Employee.GENDER_CHOICES:
+            self.genders[code] = code
+            self.genders[label] = code
+
+    def run(self, rows):
+        result = ImportResult()
+        self.departments = dict(Department.objects.values_list('name', 'id'))
+        self.job_titles = dict(JobTitle.objects.values_list('name', 'id'))
+        self.seen_usernames = set()
+        self.seen_id_numbers = set()
+
+        executor = None
+        read = 0
+        try:
+            batch = []
+            for line, row in rows:
+                batch.append((line, row))
+                read += 1
+                if len(batch) >= self.batch_size:
+                    executor = executor or self._executor(read)
+                    self._import_batch(batch, result, executor)
+                    batch = []
+            if batch:
+                executor = executor or self._executor(read)
+                self._import_batch(batch, result, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return result
+
+    def _executor(self, read):
+        # 讀取的列數超過門檻才啟動行程池，之後的批次都使用它
+        if self.workers > 1 and read > self.process_threshold:
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return None
+
+    def _clean(self, line, row, result):
+        username = row.get('username', '')
+        id_number = str(row.get('id_number', '')).upper()
+        if not username:
+            result.add_error(line, '用戶名不能為空')
+            return None
+        if not self.id_number_regex.match(id_number):
+            result.add_error(line, f'身份證號 "{id_number}" 格式不正確')
+            return None
+        if username in self.seen_usernames:
+            result.add_error(line, f'用戶名 "{username}" 在檔案中重複')
+            return None
+        if id_number in self.seen_id_numbers:
+            result.add_error(line, f'身份證號 "{id_number}" 在檔案中重複')
+            return None
+
+        gender = self.genders.get(row.get('gender', ''))
+        if gender is None:
+            result.add_error(line, f'性別 "{row.get("gender", "")}" 不正確')
+            return None
+
+        birth_date = row.get('birth_date') or None
+        if isinstance(birth_date, datetime):
+            birth_date = birth_date.date()
+        elif isinstance(birth_date, str):
+            try:
+                birth_date = parse_date(birth_date)
+            except ValueError:
+                birth_date = None
+            if birth_date is None:
+                result.add_error(line, f'出生日期 "{row.get("birth_date")}" 格式不正確')
+                return None
+
+        department_id = None
+        if row.get('department'):
+            department_id = self.departments.get(row['department'])
+            if department_id is None:
+                result.add_error(line, f'部門 "{row["department"]}" 不存在')
+                return None
+        job_title_id = None
+        if row.get('job_title'):
+            job_title_id = self.job_titles.get(row['job_title'])
+            if job_title_id is None:
+                result.add_error(line, f'職稱 "{row["job_title"]}" 不存在')
+                return None
+
+        self.seen_usernames.add(username)
+        self.seen_id_numbers.add(id_number)
+        return {
+            'line': line,
+            'username': username,
+            'password': row.get('password', ''),
+            'email': row.get('email', ''),
+            'first_name': row.get('first_name', ''),
+            'last_name': row.get('last_name', ''),
+            'id_number': id_number,
+            'gender': gender,
+            'birth_date': birth_date,
+            'department_id': department_id,
+            'job_title_id': job_title_id,
+        }
+
+    def _import_batch(self, batch, result, executor):
+        cleaned = [row for row in (self._clean(line, row, result) for line, row in batch) if row]
+        if not cleaned:
+            return
+
+        # 每批各一次查詢檢查資料庫中已存在的用戶名與身份證號
+        taken_usernames = set(
+            User.objects.filter(username__in=[row['username'] for row in cleaned])
+            .values_list('username', flat=True)
+        )
+        taken_id_numbers = set(
+            Employee.objects.filter(id_number__in=[row['id_number'] for row in cleaned])
+            .values_list('id_number', flat=True)
+        )
+        valid = []
+        for row in cleaned:
+            if row['username'] in taken_usernames:
+                result.add_error(row['line'], f'用戶名 "{row["username"]}" 已存在')
+            elif row['id_number'] in taken_id_numbers:
+                result.add_error(row['line'], f'身份證號 "{row["id_number"]}" 已存在')
+            else:
+                valid.append(row)
+        if not valid:
+            return
+
+        passwords = _hash_passwords([row['password'] for row in valid], executor)
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(
+                    username=row['username'],
+                    password=password,
+                    email=User.objects.normalize_email(row['email']),
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
+                )
+                for row, password in zip(valid, passwords)
+            ])
+            user_ids = dict(
+                User.objects.filter(username__in=[row['username'] for row in valid])
+                .values_list('username', 'id')
+            )
+            Employee.objects.bulk_create([
+                Employee(
+                    user_id=user_ids[row['username']],
+                    username=row['username'],
+                    id_number=row['id_number'],
+                    gender=row['gender'],
+                    birth_date=row['birth_date'],
+                    department_id=row['department_id'],
+                    job_title_id=row['job_title_id'],
+                )
+                for row in valid
+            ])
+            # bulk_create 不會觸發 post_save，需自行更新人數、搜尋索引與列表快取
+            Department.objects.adjust_headcounts(Counter(row['department_id'] for row in valid))
+            JobTitle.objects.adjust_headcounts(Counter(row['job_title_id'] for row in valid))
+            adjust_snapshot(added=[tuple(row[field] for field in COUNTED_FIELDS) for row in valid])
+            index_employees(
+                Employee.objects.filter(user_id__in=user_ids.values()).values_list('id', flat=True)
+            )
+            bump_versions('employee', 'user')
+        result.created += len(valid)
@@ -0,0 +1,54 @@
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+
+from django.conf import settings
+
+# python -X importtime 的輸出：import time: <self us> | <cumulative us> | <縮排的模組名稱>
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+ModuleCost = namedtuple('ModuleCost', ['name', 'self_us', 'cumulative_us', 'depth'])
+
+# 子行程只執行 django.setup() 並載入 URLconf（也就是所有視圖），與 worker 處理第一個請求前相同
+_STARTUP_CODE = (
+    'import django, importlib; from django.conf import settings; '
+    'django.setup(); importlib.import_module(settings.ROOT_URLCONF)'
+)
+
+
+def parse_importtime(output):
+    """``ModuleCost`` for each module in ``python -X importtime`` output."""
+    costs = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            costs.append(ModuleCost(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return costs
+
+
+def profile_startup():
+    """Import the project in a fresh interpreter and return its ``ModuleCost`` list."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'auth_project.settings')}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _STARTUP_CODE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'startup failed')
+    return parse_importtime(result.stderr)
+
+
+def by_package(costs):
+    """``{top-level package: self microseconds}``, most expensive first."""
+    totals = {}
+    for cost in costs:
+        package = cost.name.split('.')[0]
+        totals[package] = totals.get(package, 0) + cost.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def total_ms(costs):
+    return sum(cost.self_us for cost in costs) / 1000
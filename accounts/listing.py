@@ -0,0 +1,81 @@
+class ListingRecordMeta(type):
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('fields', ())
+        namespace['__slots__'] = tuple(attribute for attribute, _ in fields)
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls.lookups = tuple(lookup for _, lookup in fields)
+        return cls
+
+
+class ListingRecord(metaclass=ListingRecordMeta):
+    """
+    Lightweight, slotted row for list pages.
+
+    Subclasses declare ``fields`` as ``(attribute, ORM lookup)`` pairs; only
+    those columns are selected and no model instances are built.
+    """
+
+    fields = ()
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.pk}>'
+
+
+class Records:
+    """
+    A ``values_list()`` queryset whose rows come out as ``record_class`` instances.
+
+    Supports what list pages and the paginator use: filtering, ordering,
+    slicing, ``len()`` and sync or async iteration.
+    """
+
+    def __init__(self, queryset, record_class):
+        self.queryset = queryset
+        self.record_class = record_class
+
+    @property
+    def model(self):
+        return self.queryset.model
+
+    def _chain(self, queryset):
+        return Records(queryset, self.record_class)
+
+    def filter(self, *args, **kwargs):
+        return self._chain(self.queryset.filter(*args, **kwargs))
+
+    def exclude(self, *args, **kwargs):
+        return self._chain(self.queryset.exclude(*args, **kwargs))
+
+    def order_by(self, *fields):
+        return self._chain(self.queryset.order_by(*fields))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._chain(self.queryset[key])
+        return self.record_class(self.queryset[key])
+
+    def __iter__(self):
+        return map(self.record_class, self.queryset)
+
+    async def __aiter__(self):
+        async for row in self.queryset:
+            yield self.record_class(row)
+
+    def __len__(self):
+        return len(self.queryset)
+
+    def __bool__(self):
+        return bool(self.queryset)
+
+
+def as_records(queryset, record_class):
+    """Restrict ``queryset`` to ``record_class.fields`` and yield records instead of models."""
+    return Records(queryset.values_list(*record_class.lookups), record_class)
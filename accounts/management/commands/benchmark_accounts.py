@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmark import compare_reports, run_benchmark
+from accounts.seed import CompanySeeder
+
+
+class Command(BaseCommand):
+    help = '對 accounts 的每個路由計時，輸出延遲百分位數與查詢數的 JSON 報告'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='每個路由的請求次數')
+        parser.add_argument('--scales', type=int, nargs='+',
+                            help='依序以 seed_company --replace 產生這些員工數的資料後各測一次（會刪除先前的測試資料）')
+        parser.add_argument('--force', action='store_true', help='DEBUG 關閉時仍允許 --scales 刪除測試資料')
+        parser.add_argument('--output', '-o', help='JSON 報告路徑，預設為標準輸出')
+        parser.add_argument('--compare', help='與先前的 JSON 報告比較')
+        parser.add_argument('--host', default='localhost', help='請求使用的 Host 標頭，需在 ALLOWED_HOSTS 中')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as fileobj:
+                    baseline = json.load(fileobj)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'無法讀取比較報告: {e}')
+
+        runs = []
+        for scale in options['scales'] or [None]:
+            if scale is not None:
+                seeder = CompanySeeder(employees=scale, departments=max(20, scale // 100),
+                                       groups=max(10, scale // 1000))
+                try:
+                    seeder.remove_existing(force=options['force'])
+                except ValueError as e:
+                    raise CommandError(str(e))
+                seeder.run()
+                self.stderr.write(f'已產生 {scale} 位員工的測試資料')
+            try:
+                runs.append(run_benchmark(
+                    iterations=options['iterations'], host=options['host'], progress=self.progress,
+                ))
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        report = json.dumps({'runs': runs}, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fileobj:
+                fileobj.write(report)
+        else:
+            self.stdout.write(report)
+
+        if baseline is not None:
+            self.print_comparison(baseline, runs)
+
+    def progress(self, name, result):
+        latency = result['latency_ms']
+        self.stderr.write(
+            f'{name:<40} {result["status"]} p50 {latency["p50"]:>9.2f}ms '
+            f'p95 {latency["p95"]:>9.2f}ms  {result["queries"]["max"]} queries'
+        )
+
+    def print_comparison(self, baseline, runs):
+        # 依員工數配對兩份報告中的每一次測試
+        previous_runs = {run['meta']['employees']: run for run in baseline.get('runs', [])}
+        for run in runs:
+            previous = previous_runs.get(run['meta']['employees'])
+            if previous is None:
+                self.stderr.write(f'比較報告中沒有 {run["meta"]["employees"]} 位員工的結果')
+                continue
+            self.stderr.write(f'\n== {run["meta"]["employees"]} 位員工')
+            for name, old_p50, new_p50, old_queries, new_queries in compare_reports(previous, run):
+                change = (new_p50 - old_p50) / old_p50 * 100 if old_p50 else 0
+                self.stderr.write(
+                    f'{name:<40} p50 {old_p50:>9.2f} -> {new_p50:>9.2f}ms ({change:+.0f}%)  '
+                    f'queries {old_queries} -> {new_queries}'
+                )
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from accounts.exporters import DATASETS, EXPORT_FORMATS
+from accounts.models import Employee
+
+
+class Command(BaseCommand):
+    help = '以串流方式匯出員工、部門或職稱資料為 CSV 或 XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='輸出檔案路徑，預設為標準輸出')
+        parser.add_argument('--department', help='僅匯出此部門 ID 的員工')
+        parser.add_argument('--job-title', help='僅匯出此職稱 ID 的員工')
+        parser.add_argument('--gender', help='僅匯出此性別代碼的員工')
+
+    def handle(self, *args, **options):
+        dataset = DATASETS[options['dataset']]
+        queryset = None
+        if options['dataset'] == 'employees':
+            queryset = Employee.objects.filtered(
+                department=options['department'],
+                job_title=options['job_title'],
+                gender=options['gender'],
+            )
+        _, stream = EXPORT_FORMATS[options['format']]
+
+        if options['output']:
+            output = open(options['output'], 'wb')
+        else:
+            output = sys.stdout.buffer
+        try:
+            for chunk in stream(dataset.columns, dataset.rows(queryset)):
+                output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        finally:
+            if options['output']:
+                output.close()
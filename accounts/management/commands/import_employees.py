@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import IMPORT_BATCH_SIZE, EmployeeImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = '從 CSV 或 XLSX 檔案批次匯入員工'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV 或 XLSX 檔案路徑')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='密碼雜湊使用的行程數，預設為 CPU 核心數；不超過 ACCOUNTS_IMPORT_MAX_WORKERS')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as fileobj:
+                importer = EmployeeImporter(batch_size=options['batch_size'], workers=options['workers'])
+                result = importer.run(read_rows(fileobj, path))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result.errors:
+            self.stderr.write(f'第 {line} 行: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'已匯入 {result.created} 位員工，{len(result.errors)} 行錯誤'
+        ))
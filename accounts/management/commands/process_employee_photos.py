@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Employee
+from accounts.photos import process_employee_photo
+
+
+class Command(BaseCommand):
+    help = '為尚未處理的員工照片產生縮圖與 WebP 版本'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='重新處理所有員工照片')
+
+    def handle(self, *args, **options):
+        employees = Employee.objects.exclude(photo='').exclude(photo__isnull=True)
+        if not options['all']:
+            employees = employees.filter(photo_hash='')
+
+        processed = 0
+        for employee_id in employees.values_list('id', flat=True).iterator():
+            try:
+                process_employee_photo(employee_id)
+            except Exception as e:
+                self.stderr.write(f'員工 {employee_id} 照片處理失敗: {e}')
+            else:
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(f'已處理 {processed} 張照片'))
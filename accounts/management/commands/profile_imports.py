@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importtime import by_package, profile_startup, total_ms
+
+
+class Command(BaseCommand):
+    help = '以 python -X importtime 量測 worker 啟動時各套件與模組的載入耗時，超出預算時以錯誤結束'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='列出耗時最多的模組數')
+        parser.add_argument('--budget-ms', type=float, default=None,
+                            help='總載入時間上限（毫秒），預設為 ACCOUNTS_IMPORT_BUDGET_MS')
+
+    def handle(self, *args, **options):
+        try:
+            costs = profile_startup()
+        except RuntimeError as e:
+            raise CommandError(f'啟動失敗: {e}')
+
+        self.stdout.write('套件（自身耗時合計）')
+        for package, self_us in list(by_package(costs).items())[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {package}')
+        self.stdout.write('模組（自身耗時）')
+        for cost in sorted(costs, key=lambda cost: cost.self_us, reverse=True)[:options['top']]:
+            self.stdout.write(f'  {cost.self_us / 1000:8.1f} ms  {cost.name} (累計 {cost.cumulative_us / 1000:.1f} ms)')
+
+        total = total_ms(costs)
+        budget = options['budget_ms']
+        if budget is None:
+            budget = getattr(settings, 'ACCOUNTS_IMPORT_BUDGET_MS', None)
+        if budget is not None and total > budget:
+            raise CommandError(f'啟動載入 {len(costs)} 個模組共 {total:.1f} ms，超出預算 {budget:.0f} ms')
+        self.stdout.write(self.style.SUCCESS(f'啟動載入 {len(costs)} 個模組共 {total:.1f} ms'))
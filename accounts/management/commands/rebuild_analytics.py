@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from accounts.analytics import rebuild_snapshot, record_history
+
+
+class Command(BaseCommand):
+    help = '依員工資料重建人數統計快照，並寫入當天的統計歷史（每晚執行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=parse_date, help='歷史紀錄的日期（YYYY-MM-DD），預設為今天')
+        parser.add_argument('--no-history', action='store_true', help='只重建快照，不寫入歷史')
+
+    def handle(self, *args, date=None, no_history=False, **options):
+        total = rebuild_snapshot()
+        self.stdout.write(f'已重建 {total} 位員工的統計快照')
+        if not no_history:
+            day = record_history(date)
+            self.stdout.write(f'已寫入 {day.isoformat()} 的統計歷史')
+        self.stdout.write(self.style.SUCCESS('完成'))
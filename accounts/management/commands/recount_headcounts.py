@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.fragments import bump_versions
+from accounts.models import Department, JobTitle
+
+
+class Command(BaseCommand):
+    help = '依員工資料重新計算部門與職稱的人數'
+
+    def handle(self, *args, **options):
+        for model, version in ((Department, 'department'), (JobTitle, 'jobtitle')):
+            with transaction.atomic():
+                before = dict(model.objects.values_list('id', 'headcount'))
+                model.objects.recount_headcounts()
+                fixed = sum(
+                    1 for pk, headcount in model.objects.values_list('id', 'headcount')
+                    if before.get(pk) != headcount
+                )
+                bump_versions(version)
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name}：{len(before)} 筆，修正 {fixed} 筆人數'
+            ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from accounts.seed import CompanySeeder
+
+
+class Command(BaseCommand):
+    help = '產生固定亂數種子的測試公司資料（用戶、員工、部門、職稱、群組與權限）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000)
+        parser.add_argument('--departments', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0, help='亂數種子，相同參數產生相同資料')
+        parser.add_argument('--password', default='password', help='所有測試用戶的密碼')
+        parser.add_argument('--replace', action='store_true', help='先刪除先前產生的測試資料')
+        parser.add_argument('--force', action='store_true', help='DEBUG 關閉時仍允許 --replace 刪除測試資料')
+
+    def handle(self, *args, **options):
+        seeder = CompanySeeder(
+            employees=options['employees'],
+            departments=options['departments'],
+            groups=options['groups'],
+            seed=options['seed'],
+            password=options['password'],
+        )
+        if options['replace']:
+            try:
+                seeder.remove_existing(force=options['force'])
+            except ValueError as e:
+                raise CommandError(str(e))
+        try:
+            counts = seeder.run()
+        except IntegrityError as e:
+            raise CommandError(f'資料已存在，請加上 --replace 重新產生: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'已建立 {counts["employees"]} 位員工、{counts["departments"]} 個部門、'
+            f'{counts["job_titles"]} 個職稱、{counts["groups"]} 個群組'
+        ))
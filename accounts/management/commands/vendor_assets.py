@@ -0,0 +1,23 @@
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.assets import download_vendor_assets
+
+
+class Command(BaseCommand):
+    help = '下載固定版本的 Bootstrap、feather-icons、jQuery 與 Summernote 到 accounts/static，供離線使用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='重新下載已存在的檔案')
+
+    def handle(self, *args, **options):
+        target = os.path.join(apps.get_app_config('accounts').path, 'static')
+        try:
+            for asset, integrity, downloaded in download_vendor_assets(target, force=options['force']):
+                status = '已下載' if downloaded else '已存在'
+                self.stdout.write(f'{status} {asset.path} {integrity}')
+        except (OSError, ValueError) as e:
+            raise CommandError(f'下載失敗: {e}')
+        self.stdout.write(self.style.SUCCESS('完成；請提交 accounts/static/accounts/vendor 並執行 collectstatic'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = '預先編譯模板、載入 URL 解析器、靜態檔案清單與參考資料，並列出各步驟耗時'
+
+    def handle(self, *args, **options):
+        total = 0
+        for name, seconds in warm_up():
+            total += seconds
+            self.stdout.write(f'{name:<16}{seconds * 1000:8.1f} ms')
+        self.stdout.write(self.style.SUCCESS(f'{"total":<16}{total * 1000:8.1f} ms'))
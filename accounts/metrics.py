@@ -0,0 +1,203 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 直方圖分桶上限（秒／查詢數）
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_WHITESPACE = re.compile(r'\s+')
+# IN (%s, %s, ...) 的參數個數不同仍視為同一種查詢
+_PLACEHOLDER_LIST = re.compile(r'\((?:%s\s*,\s*)+%s\)')
+
+_current = ContextVar('accounts_request_recorder', default=None)
+
+
+def fingerprint(sql):
+    return _PLACEHOLDER_LIST.sub('(%s, ...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+class RequestRecorder:
+    """Query count, DB time and template time collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def capture(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def duplicates(self):
+        """``[(fingerprint, count)]`` of queries run more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    @property
+    def duplicate_count(self):
+        return sum(count - 1 for _, count in self.duplicates())
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(connection):
+    """
+    Route queries on ``connection`` to the recorder of the current request.
+
+    Installed on each connection as it is opened rather than per request:
+    under ASGI the ORM runs in worker threads with their own connection
+    objects, while the recorder follows the request through the context.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_templates_instrumented = False
+
+
+def instrument_templates():
+    """Time every top-level Django template render into the current recorder."""
+    global _templates_instrumented
+    if _templates_instrumented:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, *args, **kwargs):
+        recorder = _current.get()
+        if recorder is None:
+            return original_render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original_render(self, *args, **kwargs)
+        finally:
+            recorder.template_time += time.perf_counter() - started
+
+    Template.render = render
+    _templates_instrumented = True
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Per-view histograms kept in process memory.
+
+    Each worker process has its own registry, so a multi-process deployment
+    is scraped per process (or aggregated by the scraper).
+    """
+
+    HISTOGRAMS = (
+        ('request_duration_seconds', DURATION_BUCKETS, 'Total request latency by view'),
+        ('db_duration_seconds', DURATION_BUCKETS, 'Time spent in SQL queries by view'),
+        ('template_duration_seconds', DURATION_BUCKETS, 'Template render time by view'),
+        ('db_queries', QUERY_COUNT_BUCKETS, 'SQL queries per request by view'),
+    )
+    COUNTERS = (
+        ('duplicate_queries_total', 'Repeated SQL fingerprints beyond the first execution'),
+        ('query_budget_exceeded_total', 'Requests that ran more queries than the view budget'),
+    )
+
+    def __init__(self, prefix='accounts'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, view, recorder, budget_exceeded=False):
+        values = {
+            'request_duration_seconds': recorder.elapsed,
+            'db_duration_seconds': recorder.db_time,
+            'template_duration_seconds': recorder.template_time,
+            'db_queries': recorder.queries,
+        }
+        with self._lock:
+            for name, buckets, _ in self.HISTOGRAMS:
+                histogram = self._histograms.get((name, view))
+                if histogram is None:
+                    histogram = self._histograms[(name, view)] = Histogram(buckets)
+                histogram.observe(values[name])
+            counters = self._counters.setdefault(view, Counter())
+            counters['duplicate_queries_total'] += recorder.duplicate_count
+            counters['query_budget_exceeded_total'] += int(budget_exceeded)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, _, help_text in self.HISTOGRAMS:
+                metric = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (histogram_name, view), histogram in sorted(self._histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    label = _label(view)
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{view="{label}",le="+Inf"}} {histogram.total}')
+                    lines.append(f'{metric}_sum{{view="{label}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{view="{label}"}} {histogram.total}')
+            for name, help_text in self.COUNTERS:
+                metric = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                for view, counters in sorted(self._counters.items()):
+                    lines.append(f'{metric}{{view="{_label(view)}"}} {counters[name]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,137 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse
+
+from .audit import acting_request
+from .metrics import RequestRecorder, registry
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure SQL queries, DB time, template time and latency per view.
+
+    The numbers are sent back in a ``Server-Timing`` header and aggregated
+    into ``accounts.metrics.registry`` for the ``/metrics`` endpoint.
+    Streaming responses (the exports) keep recording until their body has
+    been consumed; their headers are sent first, so they carry no
+    ``Server-Timing`` header. The recorder is also attached to every
+    response as ``response.request_metrics`` for the benchmark. Views
+    listed in ``ACCOUNTS_QUERY_BUDGETS`` (optionally as ``'view:METHOD'``)
+    log a warning when they run more queries than allowed, or raise
+    ``QueryBudgetExceeded`` when ``ACCOUNTS_QUERY_BUDGET_STRICT`` is set (as
+    in tests).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = RequestRecorder()
+        with recorder.capture():
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = RequestRecorder()
+        with recorder.capture():
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        response.request_metrics = recorder
+        # 串流回應的查詢在送出內容時才執行，讀完內容後才記錄；
+        # FileResponse 可能由伺服器直接送出檔案，不經過 streaming_content
+        if response.streaming and not isinstance(response, FileResponse):
+            if response.is_async:
+                response.streaming_content = self._arecord_stream(request, response.streaming_content, recorder)
+            else:
+                response.streaming_content = self._record_stream(request, response.streaming_content, recorder)
+            return response
+        self.observe(request, recorder)
+        duplicates = recorder.duplicate_count
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.db_time * 1000:.1f};desc="{recorder.queries} queries, {duplicates} duplicate"',
+            f'tpl;dur={recorder.template_time * 1000:.1f}',
+            f'total;dur={recorder.elapsed * 1000:.1f}',
+        ])
+        return response
+
+    def _record_stream(self, request, content, recorder):
+        content = iter(content)
+        while True:
+            # 只在取得下一段內容時記錄，不影響讀取內容的伺服器程式碼
+            with recorder.capture():
+                chunk = next(content, _END)
+            if chunk is _END:
+                break
+            yield chunk
+        self.observe(request, recorder)
+
+    async def _arecord_stream(self, request, content, recorder):
+        content = aiter(content)
+        while True:
+            with recorder.capture():
+                chunk = await anext(content, _END)
+            if chunk is _END:
+                break
+            yield chunk
+        self.observe(request, recorder)
+
+    def observe(self, request, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else '<unresolved>'
+
+        budgets = getattr(settings, 'ACCOUNTS_QUERY_BUDGETS', {})
+        budget = budgets.get(f'{view}:{request.method}', budgets.get(view))
+        exceeded = budget is not None and recorder.queries > budget
+        registry.observe(view, recorder, budget_exceeded=exceeded)
+
+        if exceeded:
+            repeated = '\n'.join(f'  {count}x {sql}' for sql, count in recorder.duplicates()[:5])
+            message = f'{view} ran {recorder.queries} queries (budget {budget})'
+            if repeated:
+                message = f'{message}; repeated:\n{repeated}'
+            if getattr(settings, 'ACCOUNTS_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class AuditContextMiddleware:
+    """Record the authenticated user as the actor of audit events raised by the request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with acting_request(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with acting_request(request):
+            return await self.get_response(request)
@@ -1,16 +1,186 @@
-from django.db import models
+from collections import Counter
+
+from django.db import connections, models, transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
-from django.forms import widgets
-from django_summernote.widgets import SummernoteWidget
+from django.utils import timezone
+
+from .analytics import COUNTED_FIELDS, SNAPSHOT_DIMENSIONS, adjust_snapshot
+from .bio import process_bio
+from .listing import ListingRecord, as_records
+from .photos import derivative_url
+
+
+class DepartmentRow(ListingRecord):
+    fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('description', 'description'),
+        ('created_at', 'created_at'),
+        ('parent_id', 'parent_id'),
+        ('depth', 'depth'),
+        ('headcount', 'headcount'),
+        ('subtree_headcount', 'subtree_headcount'),
+    )
+
+
+def _closure_aggregate(filters, group_by, aggregate):
+    # 以閉包表的子查詢彙總，每個部門只走 (ancestor/descendant) 索引
+    totals = (
+        DepartmentClosure.objects
+        .filter(**filters)
+        .order_by()
+        .values(group_by)
+        .annotate(total=aggregate)
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=models.IntegerField()), Value(0))
+
+
+class HeadcountQuerySet(models.QuerySet):
+    # Employee 上指向此模型的外鍵名稱
+    employee_field = None
+
+    def adjust_headcounts(self, deltas):
+        """Apply ``{pk: delta}`` to the ``headcount`` column in a single UPDATE."""
+        deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+        if not deltas:
+            return
+        # 員工刪除時每列都會呼叫，直接組 SQL 以省去 ORM 編譯運算式的成本
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        cases = ' '.join(['WHEN %s THEN %s'] * len(deltas))
+        placeholders = ', '.join(['%s'] * len(deltas))
+        params = [value for item in deltas.items() for value in item] + list(deltas)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET headcount = headcount + CASE id {cases} END WHERE id IN ({placeholders})',
+                params,
+            )
+
+    def recount_headcounts(self):
+        """Recompute ``headcount`` from the employee table in one UPDATE."""
+        counts = (
+            Employee.objects
+            .filter(**{self.employee_field: OuterRef('pk')})
+            .order_by()
+            .values(self.employee_field)
+            .annotate(total=models.Count('pk'))
+            .values('total')
+        )
+        return self.update(headcount=Coalesce(Subquery(counts, output_field=models.IntegerField()), Value(0)))
+
+
+class DepartmentQuerySet(HeadcountQuerySet):
+    employee_field = 'department'
+
+    def subtree(self, department_id):
+        """``department_id`` and every department below it."""
+        return self.filter(ancestor_links__ancestor_id=department_id)
+
+    def with_hierarchy(self):
+        """Annotate ``depth`` and ``subtree_headcount`` (the sum of the subtree's counters)."""
+        return self.annotate(
+            depth=_closure_aggregate({'descendant': OuterRef('pk'), 'depth__gt': 0}, 'descendant',
+                                     models.Count('pk')),
+            subtree_headcount=_closure_aggregate({'ancestor': OuterRef('pk')}, 'ancestor',
+                                                 models.Sum('descendant__headcount')),
+        )
+
+    def for_listing(self):
+        return as_records(self.with_hierarchy(), DepartmentRow)
+
+
+class JobTitleRow(ListingRecord):
+    fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('level', 'level'),
+        ('description', 'description'),
+        ('headcount', 'headcount'),
+        ('created_at', 'created_at'),
+    )
+
+
+class JobTitleQuerySet(HeadcountQuerySet):
+    employee_field = 'job_title'
+
+    def for_listing(self):
+        return as_records(self, JobTitleRow)
+
+
+class EmployeeRow(ListingRecord):
+    fields = (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('first_name', 'user__first_name'),
+        ('last_name', 'user__last_name'),
+        ('id_number', 'id_number'),
+        ('gender', 'gender'),
+        ('department_name', 'department__name'),
+        ('job_title_name', 'job_title__name'),
+        ('photo_hash', 'photo_hash'),
+        ('bio_excerpt', 'bio_excerpt'),
+    )
+
+    def get_gender_display(self):
+        return dict(Employee.GENDER_CHOICES).get(self.gender, self.gender)
+
+    @property
+    def photo_small_url(self):
+        return derivative_url(self.photo_hash, 'small')
+
+
+class EmployeeQuerySet(models.QuerySet):
+    def under(self, department_id):
+        """
+        Employees of ``department_id`` and of every department below it.
+
+        Runs one query to tell whether the department is a leaf; async callers
+        build the queryset through ``sync_to_async``.
+        """
+        subtree = DepartmentClosure.objects.filter(ancestor_id=department_id).values_list('descendant_id', flat=True)
+        # 沒有下層部門時改用等值條件，(department, 排序欄位, id) 索引即可直接提供排序
+        leaves = list(subtree[:2])
+        if len(leaves) == 1:
+            return self.filter(department_id=leaves[0])
+        return self.filter(department__in=subtree)
+
+    def filtered(self, department=None, job_title=None, gender=None):
+        # 員工列表、匯出共用的篩選條件，忽略不合法的值；部門包含其下層部門
+        queryset = self
+        if department and str(department).isdigit():
+            queryset = queryset.under(department)
+        if job_title and str(job_title).isdigit():
+            queryset = queryset.filter(job_title_id=job_title)
+        if gender and gender in dict(Employee.GENDER_CHOICES):
+            queryset = queryset.filter(gender=gender)
+        return queryset
+
+    def for_listing(self):
+        # 只取列表實際顯示的欄位，不載入 bio、照片、密碼雜湊與描述文字
+        return as_records(self, EmployeeRow)
+
+    def sync_usernames(self):
+        """Copy ``user.username`` into the denormalised ``username`` column where they differ."""
+        current = User.objects.filter(pk=OuterRef('user_id')).values('username')[:1]
+        return self.exclude(username=Subquery(current)).update(username=Subquery(current))
 
 # Create your models here.
 class Department(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="部門名稱")
     description = models.TextField(blank=True, null=True, verbose_name="部門描述")
+    # 刪除上層部門時，下層部門成為最上層（閉包表由 signals 同步）
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='children', verbose_name="上層部門")
+    # 直屬員工數，由 Employee 的儲存與刪除維護；recount_headcounts 可重新計算
+    headcount = models.PositiveIntegerField(default=0, editable=False, verbose_name="人數")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="創建時間")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新時間")
     
+    objects = DepartmentQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
     
@@ -19,13 +189,30 @@ class Department(models.Model):
         verbose_name = "部門"
         verbose_name_plural = "部門"
 
+class DepartmentClosure(models.Model):
+    # 部門階層的閉包表：每對祖先與子孫（含自己，depth 為 0）各一列
+    ancestor = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='department_closure_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='department_closure_up_idx'),
+        ]
+
 class JobTitle(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name='職稱名稱')
     description = models.TextField(blank=True, null=True, verbose_name='職稱描述')
     level = models.PositiveSmallIntegerField(default=1, verbose_name='職級')
+    headcount = models.PositiveIntegerField(default=0, editable=False, verbose_name='人數')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = JobTitleQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
     
@@ -42,13 +229,19 @@ class Employee(models.Model):
     )
     
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='employee', verbose_name='用戶')
+    # user.username 的副本，讓列表依用戶名排序時能與篩選欄位共用複合索引；用戶改名時由 signals 同步
+    username = models.CharField(max_length=150, blank=True, default='', editable=False, verbose_name='用戶名')
     id_number = models.CharField(max_length=20, unique=True, verbose_name='身份證號碼', 
                                 validators=[RegexValidator(regex=r'^[A-Z][12]\d{8}$', 
                                 message='請輸入有效的身份證號碼')])
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, verbose_name='性別')
     birth_date = models.DateField(null=True, blank=True, verbose_name='出生日期')
     photo = models.ImageField(upload_to='employee_photos', null=True, blank=True, verbose_name='照片')
+    photo_hash = models.CharField(max_length=64, blank=True, default='', editable=False, verbose_name='照片雜湊')
     bio = models.TextField(blank=True, null=True, verbose_name='自傳')
+    # 儲存時產生：已清理的 HTML 與純文字摘要
+    bio_html = models.TextField(blank=True, default='', editable=False, verbose_name='自傳（已清理）')
+    bio_excerpt = models.CharField(max_length=255, blank=True, default='', editable=False, verbose_name='自傳摘要')
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, 
                                   related_name='employees', verbose_name='部門')
     job_title = models.ForeignKey(JobTitle, on_delete=models.SET_NULL, null=True, blank=True, 
@@ -56,10 +249,235 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
     
+    objects = EmployeeQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.user.username} - {self.id_number}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 記下載入時的部門、職稱、性別與生日，儲存時只調整有變動的人數與統計快照
+        if all(field in instance.__dict__ for field in COUNTED_FIELDS):
+            instance._counted = tuple(getattr(instance, field) for field in COUNTED_FIELDS)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'bio' in update_fields:
+            self.bio, self.bio_html, self.bio_excerpt = process_bio(self.bio)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'bio_html', 'bio_excerpt'}
+        if not self.username and self.user_id:
+            self.username = self.user.username
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'username'}
+        counted = update_fields is None or bool(
+            {'department', 'job_title', 'gender', 'birth_date'} & set(update_fields)
+        )
+        adding = self._state.adding
+        previous = None if adding else getattr(self, '_counted', None)
+        # 與員工資料在同一個交易中更新人數；已在交易中時不另開 savepoint
+        with transaction.atomic(savepoint=False):
+            if counted and not adding and previous is None:
+                previous = Employee.objects.filter(pk=self.pk).values_list(*COUNTED_FIELDS).first()
+            super().save(*args, **kwargs)
+            if counted:
+                self._update_headcounts(previous)
+    
+    def _update_headcounts(self, previous):
+        current = tuple(getattr(self, field) for field in COUNTED_FIELDS)
+        old_department, old_job_title = previous[:2] if previous else (None, None)
+        if old_department != self.department_id:
+            Department.objects.adjust_headcounts({old_department: -1, self.department_id: 1})
+        if old_job_title != self.job_title_id:
+            JobTitle.objects.adjust_headcounts({old_job_title: -1, self.job_title_id: 1})
+        if previous != current:
+            adjust_snapshot([previous] if previous else [], [current])
+        self._counted = current
+    
+    # 背景產生的縮圖尚未完成時回傳空字串
+    @property
+    def photo_small_url(self):
+        return derivative_url(self.photo_hash, 'small')
+    
+    @property
+    def photo_medium_url(self):
+        return derivative_url(self.photo_hash, 'medium')
+    
+    @property
+    def photo_large_url(self):
+        return derivative_url(self.photo_hash, 'large')
+    
     class Meta:
-        ordering = ['user__username']
+        ordering = ['username']
         verbose_name = '員工'
         verbose_name_plural = '員工'
+        # 員工列表的 keyset 分頁：每個排序欄位各一個 (排序欄位, id) 索引，以及每個等值篩選條件
+        # 加上排序欄位的索引，篩選後的頁面也不需另外排序。id_number 的唯一索引已可提供排序
+        indexes = [
+            models.Index(fields=['username', 'id'], name='employee_username_idx'),
+            models.Index(fields=['department', 'username', 'id'], name='employee_dept_username_idx'),
+            models.Index(fields=['department', 'id_number', 'id'], name='employee_dept_id_number_idx'),
+            models.Index(fields=['job_title', 'username', 'id'], name='employee_job_username_idx'),
+            models.Index(fields=['job_title', 'id_number', 'id'], name='employee_job_id_number_idx'),
+            models.Index(fields=['gender', 'username', 'id'], name='employee_gender_username_idx'),
+            models.Index(fields=['gender', 'id_number', 'id'], name='employee_gender_id_number_idx'),
+        ]
+
+
+class EmployeeSearchDocument(models.Model):
+    # 不支援 FTS5 的資料庫使用的搜尋索引表
+    employee = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True,
+                                    related_name='search_document')
+    document = models.TextField()
+
+
+class EmployeeSearchTrigram(models.Model):
+    # EmployeeSearchDocument 的 trigram 索引：每份文件中每個不同的三字元片段一列
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [models.Index(fields=['trigram', 'employee'], name='search_trigram_idx')]
+
+
+class AuditEventRow(ListingRecord):
+    fields = (
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('actor_id', 'actor_id'),
+        ('actor_username', 'actor_username'),
+        ('action', 'action'),
+        ('target_type', 'target_type'),
+        ('target_id', 'target_id'),
+        ('target_repr', 'target_repr'),
+        ('changes', 'changes'),
+    )
+
+
+class AuditEventQuerySet(models.QuerySet):
+    def filtered(self, actor=None, target_type=None, target_id=None, since=None, until=None):
+        # 稽核紀錄查詢頁的篩選條件；since/until 為 datetime，until 不含
+        queryset = self
+        if actor:
+            queryset = queryset.filter(actor_username=actor)
+        if target_type:
+            queryset = queryset.filter(target_type=target_type)
+            if target_id and str(target_id).isdigit():
+                queryset = queryset.filter(target_id=target_id)
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        if until:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
+
+    def for_listing(self):
+        return as_records(self, AuditEventRow)
+
+
+class AuditEvent(models.Model):
+    """One change made by a user; rows are only ever inserted (see accounts.audit)."""
+
+    # 不建立外鍵約束：刪除用戶後紀錄仍保留原本的 id 與用戶名
+    actor = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+                              related_name='+', verbose_name='操作者')
+    actor_username = models.CharField(max_length=150, blank=True, default='', verbose_name='操作者用戶名')
+    action = models.CharField(max_length=50, verbose_name='動作')
+    target_type = models.CharField(max_length=20, verbose_name='對象類型')
+    target_id = models.BigIntegerField(null=True, blank=True, verbose_name='對象 ID')
+    target_repr = models.CharField(max_length=200, blank=True, default='', verbose_name='對象')
+    changes = models.JSONField(default=dict, blank=True, verbose_name='變更內容')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='時間')
+
+    objects = AuditEventQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Audit events cannot be modified')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Audit events cannot be deleted')
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        verbose_name = '稽核紀錄'
+        verbose_name_plural = '稽核紀錄'
+        # 查詢頁依操作者、對象或時間篩選，並以 (created_at, id) 做 keyset 分頁
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='audit_created_idx'),
+            models.Index(fields=['actor_username', 'created_at', 'id'], name='audit_actor_idx'),
+            models.Index(fields=['target_type', 'target_id', 'created_at', 'id'], name='audit_target_idx'),
+        ]
+
+
+class HeadcountSnapshotQuerySet(models.QuerySet):
+    def adjust(self, deltas):
+        """Apply ``{dimension tuple: delta}`` to ``count``, creating missing cells."""
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        cells = {key: dict(zip(SNAPSHOT_DIMENSIONS, key)) for key in deltas}
+        # 新的組合先以 0 建立，已存在的列由唯一約束略過
+        self.bulk_create([self.model(**cells[key]) for key, delta in deltas.items() if delta > 0],
+                         ignore_conflicts=True)
+        for key, delta in deltas.items():
+            self.filter(**cells[key]).update(count=F('count') + delta)
+
+    def merge(self, field, old_id, new_id=0):
+        """Move every cell with ``field == old_id`` to ``new_id`` (a deleted department or job title)."""
+        rows = list(self.filter(**{field: old_id}).values_list(*SNAPSHOT_DIMENSIONS, 'count'))
+        if not rows:
+            return
+        index = SNAPSHOT_DIMENSIONS.index(field)
+        deltas = Counter()
+        for *key, count in rows:
+            key[index] = new_id
+            deltas[tuple(key)] += count
+        self.filter(**{field: old_id}).delete()
+        self.adjust(deltas)
+
+
+class HeadcountSnapshot(models.Model):
+    """
+    Current headcount per department, job title, gender and age band.
+
+    Kept up to date by employee saves and deletes; ``accounts.analytics``
+    rebuilds it nightly. 0 stands for no department / job title.
+    """
+
+    department_id = models.BigIntegerField(default=0, verbose_name='部門 ID')
+    job_title_id = models.BigIntegerField(default=0, verbose_name='職稱 ID')
+    gender = models.CharField(max_length=1, blank=True, default='', verbose_name='性別')
+    age_band = models.CharField(max_length=10, verbose_name='年齡層')
+    count = models.IntegerField(default=0, verbose_name='人數')
+
+    objects = HeadcountSnapshotQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '人數統計快照'
+        verbose_name_plural = '人數統計快照'
+        constraints = [
+            models.UniqueConstraint(fields=list(SNAPSHOT_DIMENSIONS), name='headcount_snapshot_cell'),
+        ]
+
+
+class HeadcountHistory(models.Model):
+    """``HeadcountSnapshot`` as it was at the end of each day; written by ``rebuild_analytics``."""
+
+    date = models.DateField(verbose_name='日期')
+    department_id = models.BigIntegerField(default=0, verbose_name='部門 ID')
+    job_title_id = models.BigIntegerField(default=0, verbose_name='職稱 ID')
+    gender = models.CharField(max_length=1, blank=True, default='', verbose_name='性別')
+    age_band = models.CharField(max_length=10, verbose_name='年齡層')
+    count = models.IntegerField(default=0, verbose_name='人數')
+
+    class Meta:
+        ordering = ['date']
+        verbose_name = '人數統計歷史'
+        verbose_name_plural = '人數統計歷史'
+        # 趨勢查詢只依日期範圍掃描
+        constraints = [
+            models.UniqueConstraint(fields=['date', *SNAPSHOT_DIMENSIONS], name='headcount_history_cell'),
+        ]
@@ -0,0 +1,102 @@
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over ``order_field`` with the primary key as tie-breaker.
+
+    A cursor is ``n<pk>`` (rows after that row) or ``p<pk>`` (rows before it),
+    so every page is a range scan on ``(order_field, pk)`` instead of an OFFSET.
+    """
+
+    def __init__(self, queryset, order_field, per_page=50):
+        self.queryset = queryset
+        self.descending = order_field.startswith('-')
+        self.field = order_field.lstrip('-')
+        self.per_page = per_page
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [prefix + self.field, prefix + 'pk']
+
+    def _boundary(self, pk):
+        # 以游標指向的那一列取得排序值；該列已被刪除時為空
+        return (
+            self.queryset.model._default_manager
+            .filter(pk=pk)
+            .values_list(self.field, flat=True)[:1]
+        )
+
+    def _after(self, value, pk, reverse=False):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        # 等同 (field, pk) > (value, pk)；外層的範圍條件讓資料庫從索引中游標的位置開始讀取，
+        # 只寫成 OR 時 SQLite 會從索引開頭掃描
+        return Q(**{f'{self.field}__{lookup}e': value}) & (
+            Q(**{f'{self.field}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk})
+        )
+
+    def _parse(self, cursor):
+        if not cursor or cursor[0] not in 'np' or not cursor[1:].isdigit():
+            return None, None
+        return cursor[0], int(cursor[1:])
+
+    def _window(self, direction, pk, boundary):
+        if not boundary:
+            direction = None
+        reverse = direction == 'p'
+        queryset = self.queryset.order_by(*self._ordering(reverse))
+        if direction:
+            queryset = queryset.filter(self._after(boundary[0], pk, reverse))
+        return direction, queryset[:self.per_page + 1]
+
+    def _build_page(self, direction, rows):
+        reverse = direction == 'p'
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows)
+
+        has_next = direction == 'p' or (has_more and not reverse)
+        has_previous = direction == 'n' or (has_more and reverse)
+        return KeysetPage(
+            rows,
+            next_cursor=f'n{rows[-1].pk}' if has_next else None,
+            previous_cursor=f'p{rows[0].pk}' if has_previous else None,
+        )
+
+    def page(self, cursor=None):
+        direction, pk = self._parse(cursor)
+        boundary = list(self._boundary(pk)) if pk is not None else []
+        direction, window = self._window(direction, pk, boundary)
+        return self._build_page(direction, list(window))
+
+    async def apage(self, cursor=None):
+        """Async version of ``page()`` using the async ORM iteration API."""
+        direction, pk = self._parse(cursor)
+        boundary = [value async for value in self._boundary(pk)] if pk is not None else []
+        direction, window = self._window(direction, pk, boundary)
+        return self._build_page(direction, [row async for row in window])
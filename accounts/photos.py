@@ -0,0 +1,130 @@
+import hashlib
+import io
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .fragments import bump_versions
+
+logger = logging.getLogger(__name__)
+
+# 縮圖尺寸（正方形邊長，像素）；'large' 為保留比例的 WebP 版本
+PHOTO_THUMBNAIL_SIZES = {'small': 64, 'medium': 256}
+PHOTO_LARGE_MAX_SIZE = 1024
+PHOTO_WEBP_QUALITY = 80
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _derived_dir():
+    return f'{getattr(settings, "EMPLOYEE_PHOTOS_DIR", "employee_photos")}/derived'
+
+
+def derivative_name(photo_hash, size):
+    """Storage path of a derivative; identical uploads share the same files."""
+    return f'{_derived_dir()}/{photo_hash[:2]}/{photo_hash}_{size}.webp'
+
+
+def derivative_url(photo_hash, size):
+    if not photo_hash:
+        return ''
+    return default_storage.url(derivative_name(photo_hash, size))
+
+
+def _encode_webp(image):
+    output = io.BytesIO()
+    # 不傳入 exif 參數，輸出檔不含 EXIF
+    image.save(output, format='WEBP', quality=PHOTO_WEBP_QUALITY, method=4)
+    return output.getvalue()
+
+
+def build_derivatives(data):
+    """Return ``{size: webp_bytes}`` for the original image bytes."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        # 先依 EXIF 方向旋轉，之後輸出時丟棄 EXIF
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        derivatives = {}
+        for size, edge in PHOTO_THUMBNAIL_SIZES.items():
+            thumbnail = ImageOps.fit(image, (edge, edge), method=Image.Resampling.LANCZOS)
+            derivatives[size] = _encode_webp(thumbnail)
+        large = image.copy()
+        large.thumbnail((PHOTO_LARGE_MAX_SIZE, PHOTO_LARGE_MAX_SIZE), Image.Resampling.LANCZOS)
+        derivatives['large'] = _encode_webp(large)
+    return derivatives
+
+
+def process_employee_photo(employee_id):
+    """Generate and store the derivatives for one employee's current photo."""
+    from .models import Employee
+
+    employee = Employee.objects.filter(pk=employee_id).only('id', 'photo', 'photo_hash').first()
+    if employee is None or not employee.photo:
+        return None
+    photo_name = employee.photo.name
+    with employee.photo.open('rb') as photo:
+        data = photo.read()
+
+    photo_hash = hashlib.sha256(data).hexdigest()
+    sizes = list(PHOTO_THUMBNAIL_SIZES) + ['large']
+    if not all(default_storage.exists(derivative_name(photo_hash, size)) for size in sizes):
+        for size, content in build_derivatives(data).items():
+            name = derivative_name(photo_hash, size)
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(content))
+
+    # 僅在照片未被再次更換時寫入雜湊；update() 不觸發 post_save，需自行讓列表快取失效
+    if Employee.objects.filter(pk=employee_id, photo=photo_name).update(photo_hash=photo_hash):
+        bump_versions('employee')
+    return photo_hash
+
+
+def _run_worker():
+    while True:
+        employee_id = _queue.get()
+        try:
+            close_old_connections()
+            process_employee_photo(employee_id)
+        except Exception:
+            logger.exception('Failed to process photo for employee %s', employee_id)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name='employee-photo-worker', daemon=True)
+            _worker.start()
+
+
+def queue_photo_processing(employee_id):
+    """
+    Queue derivative generation for ``employee_id`` once the transaction commits.
+
+    Work runs on a background thread so the upload request returns at once.
+    Jobs lost on shutdown are picked up by ``manage.py process_employee_photos``.
+    """
+    def enqueue():
+        _ensure_worker()
+        _queue.put(employee_id)
+
+    transaction.on_commit(enqueue)
+
+
+def wait_for_photo_queue():
+    """Block until the worker has processed every queued photo (used by the tests)."""
+    _queue.join()
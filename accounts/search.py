@@ -0,0 +1,297 @@
+import logging
+import re
+import unicodedata
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'accounts_employee_search'
+SEARCH_BATCH_SIZE = 500
+# trigram 無法索引少於三個字元的詞（中文詞除外，見 CJK_GRAM_MARKER）：與長詞一起出現時只在
+# 長詞的結果中比對，全部是短詞時改為比對有索引的用戶名與身份證號開頭
+TRIGRAM_MIN_LENGTH = 3
+# 中文姓名常只有一兩個字：文件中另外加入以此字元補足三個字元的單字與雙字詞，
+# 一兩個字的中文查詢也能使用 trigram 索引。私用區字元不會出現在輸入中
+CJK_GRAM_MARKER = '\ue000'
+_CJK_RUN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+# 字首範圍查詢的上界
+PREFIX_END = '\U0010ffff'
+
+
+def normalize(text):
+    # 全形轉半形並轉小寫，讓「ＡＢＣ」與「abc」相同
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def _document(username, first_name, last_name, email, id_number, department, job_title):
+    # 中文姓名通常拆在 last_name + first_name，兩種順序都放入索引
+    parts = [
+        username, f'{last_name}{first_name}', f'{first_name} {last_name}',
+        email, id_number, department, job_title,
+    ]
+    text = normalize(' '.join(part for part in parts if part))
+    return ' '.join([text, *sorted(_cjk_grams(text))])
+
+
+def _cjk_gram(term):
+    # 一兩個字的中文詞對應的索引詞，其他詞回傳 None
+    if len(term) < TRIGRAM_MIN_LENGTH and _CJK_RUN.fullmatch(term):
+        return CJK_GRAM_MARKER * (TRIGRAM_MIN_LENGTH - len(term)) + term
+    return None
+
+
+def _cjk_grams(text):
+    grams = set()
+    for run in _CJK_RUN.findall(text):
+        for size in range(1, TRIGRAM_MIN_LENGTH):
+            grams.update(_cjk_gram(run[index:index + size]) for index in range(len(run) - size + 1))
+    return grams
+
+
+def _documents(employee_ids):
+    from .models import Employee
+
+    rows = Employee.objects.filter(pk__in=employee_ids).values_list(
+        'id', 'user__username', 'user__first_name', 'user__last_name', 'user__email',
+        'id_number', 'department__name', 'job_title__name',
+    )
+    return [(row[0], _document(*row[1:])) for row in rows]
+
+
+def _terms(query):
+    return [term for term in normalize(query).split() if term]
+
+
+def _split(terms):
+    # (可用 trigram 索引的詞, 其餘短詞)；短的中文詞換成對應的索引詞
+    indexed, short = [], []
+    for term in terms:
+        if len(term) >= TRIGRAM_MIN_LENGTH:
+            indexed.append(term)
+        elif _cjk_gram(term):
+            indexed.append(_cjk_gram(term))
+        else:
+            short.append(term)
+    return indexed, short
+
+
+def _trigrams(text):
+    return {text[index:index + TRIGRAM_MIN_LENGTH] for index in range(len(text) - TRIGRAM_MIN_LENGTH + 1)}
+
+
+def _prefix_search(terms, limit):
+    # 用戶名與身份證號各有索引，以範圍條件比對開頭，不掃描整個搜尋表
+    from .models import Employee
+
+    employees = Employee.objects.all()
+    for term in terms:
+        employees = employees.filter(
+            Q(username__gte=term, username__lt=term + PREFIX_END)
+            | Q(id_number__gte=term.upper(), id_number__lt=term.upper() + PREFIX_END)
+        )
+    return list(employees.order_by('id').values_list('id', flat=True)[:limit])
+
+
+def _batches(ids, size=SEARCH_BATCH_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class SQLiteFTSBackend:
+    """SQLite FTS5 virtual table with the ``trigram`` tokenizer (SQLite 3.34+)."""
+
+    def ensure_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                f"USING fts5(employee_id UNINDEXED, document, tokenize='trigram')"
+            )
+
+    # rowid 即為 employee_id：UNINDEXED 欄位的條件會掃描整個索引，rowid 則直接定位
+    def index(self, employee_ids):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for batch in _batches(employee_ids):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', batch)
+                documents = _documents(batch)
+                if documents:
+                    cursor.executemany(
+                        f'INSERT INTO {SEARCH_TABLE} (rowid, employee_id, document) VALUES (%s, %s, %s)',
+                        [(employee_id, employee_id, document) for employee_id, document in documents],
+                    )
+
+    def remove(self, employee_ids):
+        with connection.cursor() as cursor:
+            for batch in _batches(employee_ids):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', batch)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, query, limit):
+        long_terms, short_terms = _split(_terms(query))
+        if not long_terms:
+            return _prefix_search(short_terms, limit) if short_terms else []
+
+        # 短詞的 instr() 只檢查 MATCH 找到的列
+        where = [f'{SEARCH_TABLE} MATCH %s']
+        params = [' AND '.join('"{}"'.format(term.replace('"', '""')) for term in long_terms)]
+        for term in short_terms:
+            where.append('instr(document, %s) > 0')
+            params.append(term)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT employee_id FROM {SEARCH_TABLE} WHERE {" AND ".join(where)} '
+                f'ORDER BY rank LIMIT %s',
+                # SQLite 的 LIMIT -1 表示不限筆數
+                [*params, -1 if limit is None else limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class ModelBackend:
+    """
+    Denormalised ``EmployeeSearchDocument`` table for databases without FTS5.
+
+    Long terms are looked up in the indexed ``EmployeeSearchTrigram`` table
+    and only the candidate documents are checked with ``contains``.
+    """
+
+    def ensure_table(self):
+        pass
+
+    def index(self, employee_ids):
+        from .models import EmployeeSearchDocument, EmployeeSearchTrigram
+
+        with transaction.atomic():
+            for batch in _batches(employee_ids):
+                EmployeeSearchDocument.objects.filter(employee_id__in=batch).delete()
+                EmployeeSearchTrigram.objects.filter(employee_id__in=batch).delete()
+                documents = _documents(batch)
+                EmployeeSearchDocument.objects.bulk_create([
+                    EmployeeSearchDocument(employee_id=employee_id, document=document)
+                    for employee_id, document in documents
+                ])
+                EmployeeSearchTrigram.objects.bulk_create([
+                    EmployeeSearchTrigram(employee_id=employee_id, trigram=trigram)
+                    for employee_id, document in documents
+                    for trigram in _trigrams(document)
+                ], batch_size=SEARCH_BATCH_SIZE)
+
+    def remove(self, employee_ids):
+        from .models import EmployeeSearchDocument, EmployeeSearchTrigram
+
+        employee_ids = list(employee_ids)
+        EmployeeSearchTrigram.objects.filter(employee_id__in=employee_ids).delete()
+        EmployeeSearchDocument.objects.filter(employee_id__in=employee_ids).delete()
+
+    def clear(self):
+        from .models import EmployeeSearchDocument, EmployeeSearchTrigram
+
+        EmployeeSearchTrigram.objects.all().delete()
+        EmployeeSearchDocument.objects.all().delete()
+
+    def search(self, query, limit):
+        from .models import EmployeeSearchDocument, EmployeeSearchTrigram
+
+        long_terms, short_terms = _split(_terms(query))
+        if not long_terms:
+            return _prefix_search(short_terms, limit) if short_terms else []
+
+        documents = EmployeeSearchDocument.objects.all()
+        for term in long_terms:
+            # 含有詞中每個 trigram 的員工才是候選，再以 contains 確認順序相連
+            trigrams = _trigrams(term)
+            candidates = (
+                EmployeeSearchTrigram.objects.filter(trigram__in=trigrams)
+                .values('employee_id')
+                .annotate(matched=Count('trigram'))
+                .filter(matched=len(trigrams))
+                .values('employee_id')
+            )
+            documents = documents.filter(employee_id__in=candidates)
+        for term in [*long_terms, *short_terms]:
+            documents = documents.filter(document__contains=term)
+        return list(documents.order_by('employee_id').values_list('employee_id', flat=True)[:limit])
+
+
+_backend = None
+# deferred_indexing() 區塊內等待重建索引的員工 id
+_pending = ContextVar('accounts_search_pending', default=None)
+
+
+def create_search_table():
+    """Create the FTS5 table when the database supports it; run after ``migrate``."""
+    global _backend
+    if connection.vendor == 'sqlite':
+        try:
+            SQLiteFTSBackend().ensure_table()
+        except DatabaseError:
+            logger.warning('SQLite FTS5 trigram tokenizer unavailable, using the fallback search table')
+    _backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        # 只檢查資料表是否存在，建立資料表由 migrate 後的 create_search_table() 負責
+        backend = ModelBackend()
+        if connection.vendor == 'sqlite' and SEARCH_TABLE in connection.introspection.table_names():
+            backend = SQLiteFTSBackend()
+        _backend = backend
+    return _backend
+
+
+@contextmanager
+def deferred_indexing():
+    """Collect ``index_employees()`` calls inside the block and index each employee once at the end."""
+    pending = set()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    index_employees(pending)
+
+
+def index_employees(employee_ids):
+    employee_ids = list(employee_ids)
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(employee_ids)
+    elif employee_ids:
+        get_backend().index(employee_ids)
+
+
+def remove_employees(employee_ids):
+    employee_ids = list(employee_ids)
+    if employee_ids:
+        get_backend().remove(employee_ids)
+
+
+def rebuild_index():
+    from .models import Employee
+
+    backend = get_backend()
+    backend.clear()
+    employee_ids = Employee.objects.values_list('id', flat=True).order_by('id')
+    total = 0
+    for batch in _batches(employee_ids.iterator(), SEARCH_BATCH_SIZE):
+        backend.index(batch)
+        total += len(batch)
+    return total
+
+
+def search_employee_ids(query, limit=20):
+    """
+    Employee ids matching every whitespace-separated term in ``query``, best
+    first; ``limit=None`` returns every match.
+    """
+    return get_backend().search(query, limit)
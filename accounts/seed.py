@@ -0,0 +1,226 @@
+import random
+import re
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, Permission, User
+from django.db import transaction
+
+from .analytics import rebuild_snapshot
+from .fragments import VERSIONED_MODELS, bump_versions
+from .hierarchy import rebuild_closure
+from .models import Department, Employee, JobTitle
+from .search import rebuild_index
+
+# 產生的用戶名、部門、職稱與群組名稱都以此開頭，部門與職稱的說明另以 SEED_DESCRIPTION_SUFFIX 結尾；
+# remove_existing() 只刪除同時符合這些標記的資料
+SEED_PREFIX = 'seed-'
+SEED_DESCRIPTION_SUFFIX = '（測試資料）'
+SEED_BATCH_SIZE = 1000
+# 部門階層：第一個部門為最上層，其餘每個部門最多有這麼多個下層部門
+SEED_DEPARTMENT_FANOUT = 4
+
+SURNAMES = '陳林黃張李王吳劉蔡楊許鄭謝洪郭邱曾廖賴徐周葉蘇莊呂江何蕭羅高潘簡朱鍾游彭詹胡施沈余'
+GIVEN_NAME_CHARS = '志明俊傑建宏家豪冠宇承恩宗翰雅婷怡君淑芬美玲佳蓉欣怡詩涵心怡雨彤柏翰品妤子晴宇軒'
+DEPARTMENT_NAMES = (
+    '總經理室', '人力資源部', '財務部', '會計部', '法務部', '資訊部', '研發部', '品保部',
+    '生產管理部', '製造一部', '製造二部', '採購部', '倉儲物流部', '業務部', '海外業務部',
+    '行銷部', '客服部', '工安環保部', '設備工程部', '稽核室',
+)
+JOB_TITLES = (
+    ('助理', 1), ('專員', 2), ('資深專員', 3), ('工程師', 3), ('資深工程師', 4),
+    ('技術員', 2), ('組長', 4), ('課長', 5), ('副理', 6), ('經理', 7),
+    ('資深經理', 8), ('協理', 9), ('處長', 10), ('副總經理', 11), ('總經理', 12),
+)
+GROUP_NAMES = (
+    '系統管理員', '人資管理', '人資檢視', '財務審核', '財務檢視', '部門主管', '員工資料維護',
+    '權限稽核', '報表檢視', '匯入匯出', '研發專案', '生產排程', '品質管制', '採購簽核', '客服支援',
+)
+# 身分證字號字首對應的兩位數代碼
+ID_LETTER_CODES = {
+    'A': 10, 'B': 11, 'C': 12, 'D': 13, 'E': 14, 'F': 15, 'G': 16, 'H': 17, 'I': 34,
+    'J': 18, 'K': 19, 'L': 20, 'M': 21, 'N': 22, 'O': 35, 'P': 23, 'Q': 24, 'R': 25,
+    'S': 26, 'T': 27, 'U': 28, 'V': 29, 'W': 32, 'X': 30, 'Y': 31, 'Z': 33,
+}
+
+
+def _numbered(names, count):
+    """``count`` deterministic names, suffixing a number once the list runs out."""
+    result = []
+    for index in range(count):
+        name = names[index % len(names)]
+        if index >= len(names):
+            name = f'{name}{index // len(names) + 1}'
+        result.append(name)
+    return result
+
+
+def _generated_name_pattern(names):
+    return '^{}({})[0-9]*$'.format(re.escape(SEED_PREFIX), '|'.join(re.escape(name) for name in names))
+
+
+def department_names(count):
+    return [f'{SEED_PREFIX}{name}' for name in _numbered(DEPARTMENT_NAMES, count)]
+
+
+def group_names(count):
+    return [f'{SEED_PREFIX}{name}' for name in _numbered(GROUP_NAMES, count)]
+
+
+def seed_username(index):
+    return f'{SEED_PREFIX}{index:07d}'
+
+
+def id_number(letter, gender_digit, serial):
+    """A checksum-valid national ID number for the given letter, gender digit and serial."""
+    code = ID_LETTER_CODES[letter]
+    digits = [gender_digit] + [int(d) for d in f'{serial:07d}']
+    total = code // 10 + (code % 10) * 9 + sum(d * w for d, w in zip(digits, range(8, 0, -1)))
+    return f'{letter}{gender_digit}{serial:07d}{(10 - total % 10) % 10}'
+
+
+def _batches(items, size=SEED_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class CompanySeeder:
+    """
+    Deterministic fake company for development and benchmarks.
+
+    The same arguments and ``seed`` always produce the same rows. Everything
+    is written with ``bulk_create`` in batches, and the counters, analytics
+    snapshot and search index are rebuilt once at the end.
+    """
+
+    def __init__(self, employees=1000, departments=20, groups=10, seed=0, password='password'):
+        self.employees = employees
+        self.departments = departments
+        self.groups = groups
+        self.random = random.Random(seed)
+        self.password = password
+
+    def remove_existing(self, force=False):
+        """
+        Delete rows created by any previous run, matched by the seed prefix,
+        the generated names and (for departments and job titles) the seed
+        description. Refuses to run unless ``DEBUG`` is on or ``force`` is set.
+        """
+        if not (settings.DEBUG or force):
+            raise ValueError('只能在 DEBUG 模式下刪除測試資料；確定要刪除時請加上 --force')
+        job_titles = _generated_name_pattern([name for name, _ in JOB_TITLES])
+        with transaction.atomic():
+            User.objects.filter(
+                username__regex=f'^{re.escape(SEED_PREFIX)}[0-9]{{7}}$', is_staff=False, is_superuser=False,
+            ).delete()
+            Department.objects.filter(
+                name__regex=_generated_name_pattern(DEPARTMENT_NAMES), description__endswith=SEED_DESCRIPTION_SUFFIX,
+            ).delete()
+            JobTitle.objects.filter(name__regex=job_titles, description__endswith=SEED_DESCRIPTION_SUFFIX).delete()
+            Group.objects.filter(name__regex=_generated_name_pattern(GROUP_NAMES)).delete()
+
+    def run(self):
+        with transaction.atomic():
+            departments = Department.objects.bulk_create([
+                Department(name=name, description=f'{name}{SEED_DESCRIPTION_SUFFIX}')
+                for name in department_names(self.departments)
+            ])
+            for index, department in enumerate(departments[1:], start=1):
+                department.parent = departments[(index - 1) // SEED_DEPARTMENT_FANOUT]
+            Department.objects.bulk_update(departments[1:], ['parent'], batch_size=SEED_BATCH_SIZE)
+            rebuild_closure()
+            job_titles = JobTitle.objects.bulk_create([
+                JobTitle(name=f'{SEED_PREFIX}{name}', level=level, description=f'{name}{SEED_DESCRIPTION_SUFFIX}')
+                for name, level in JOB_TITLES
+            ])
+            groups = Group.objects.bulk_create([Group(name=name) for name in group_names(self.groups)])
+            self._assign_group_permissions(groups)
+            user_ids = self._create_employees(departments, job_titles)
+            self._assign_memberships(user_ids, groups)
+            Department.objects.recount_headcounts()
+            JobTitle.objects.recount_headcounts()
+            rebuild_snapshot()
+        rebuild_index()
+        bump_versions(*VERSIONED_MODELS)
+        return {
+            'employees': len(user_ids),
+            'departments': len(departments),
+            'job_titles': len(job_titles),
+            'groups': len(groups),
+        }
+
+    def _assign_group_permissions(self, groups):
+        permission_ids = list(Permission.objects.order_by('id').values_list('id', flat=True))
+        through = Group.permissions.through
+        rows = []
+        for group in groups:
+            count = min(len(permission_ids), self.random.randint(5, 30))
+            for permission_id in self.random.sample(permission_ids, count):
+                rows.append(through(group_id=group.pk, permission_id=permission_id))
+        through.objects.bulk_create(rows, batch_size=SEED_BATCH_SIZE)
+
+    def _create_employees(self, departments, job_titles):
+        password = make_password(self.password)
+        start = date(1960, 1, 1)
+        span = (date(2003, 12, 31) - start).days
+        letters = list(ID_LETTER_CODES)
+        user_ids = []
+
+        for batch in _batches(range(self.employees)):
+            users, rows = [], []
+            for index in batch:
+                gender = self.random.choices('MFO', weights=(48, 48, 4))[0]
+                username = seed_username(index)
+                users.append(User(
+                    username=username,
+                    password=password,
+                    email=f'{username}@example.com',
+                    first_name=''.join(self.random.choices(GIVEN_NAME_CHARS, k=2)),
+                    last_name=self.random.choice(SURNAMES),
+                ))
+                rows.append({
+                    'username': username,
+                    'id_number': id_number(letters[index % len(letters)], 2 if gender == 'F' else 1,
+                                           index // len(letters)),
+                    'gender': gender,
+                    'birth_date': start + timedelta(days=self.random.randrange(span)),
+                    'department': self.random.choice(departments),
+                    'job_title': self.random.choice(job_titles),
+                })
+            User.objects.bulk_create(users)
+            ids = dict(
+                User.objects.filter(username__in=[row['username'] for row in rows])
+                .values_list('username', 'id')
+            )
+            Employee.objects.bulk_create([
+                Employee(
+                    user_id=ids[row['username']],
+                    username=row['username'],
+                    id_number=row['id_number'],
+                    gender=row['gender'],
+                    birth_date=row['birth_date'],
+                    department=row['department'],
+                    job_title=row['job_title'],
+                )
+                for row in rows
+            ])
+            user_ids.extend(ids[row['username']] for row in rows)
+        return user_ids
+
+    def _assign_memberships(self, user_ids, groups):
+        if not groups:
+            return
+        through = User.groups.through
+        permission_ids = list(Permission.objects.order_by('id').values_list('id', flat=True))
+        user_permissions = User.user_permissions.through
+        members, grants = [], []
+        for user_id in user_ids:
+            # 每位員工屬於一至兩個群組，少數另有個人權限
+            for group in self.random.sample(groups, min(len(groups), self.random.choice((1, 1, 2)))):
+                members.append(through(user_id=user_id, group_id=group.pk))
+            if permission_ids and self.random.random() < 0.05:
+                for permission_id in self.random.sample(permission_ids, min(3, len(permission_ids))):
+                    grants.append(user_permissions(user_id=user_id, permission_id=permission_id))
+        through.objects.bulk_create(members, batch_size=SEED_BATCH_SIZE)
+        user_permissions.objects.bulk_create(grants, batch_size=SEED_BATCH_SIZE)
@@ -0,0 +1,216 @@
+from collections import Counter
+from contextvars import ContextVar
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.signals import m2m_changed
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .analytics import COUNTED_FIELDS, adjust_snapshot
+from .audit import audit_event, record_events
+from .backends import bump_auth_version
+from .fragments import bump_versions
+from .models import Department, Employee, JobTitle
+from .search import index_employees, remove_employees
+
+
+def _count_subquery(through_model, fk_name):
+    # 以子查詢統計中介表筆數，避免兩個 JOIN 相乘後再 DISTINCT
+    counts = (
+        through_model.objects
+        .filter(**{fk_name: OuterRef('pk')})
+        .order_by()
+        .values(fk_name)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def group_summaries():
+    """Groups annotated with ``member_count`` and ``permission_count``."""
+    return Group.objects.annotate(
+        member_count=_count_subquery(User.groups.through, 'group_id'),
+        permission_count=_count_subquery(Group.permissions.through, 'group_id'),
+    ).order_by('name')
+
+
+def _clean_ids(raw_ids):
+    # POST 傳來的是字串，忽略非數字的值
+    return {int(value) for value in raw_ids if str(value).isdigit()}
+
+
+def sync_relation(manager, raw_ids):
+    """
+    Make the many-to-many ``manager`` hold exactly ``raw_ids``.
+
+    Only the difference against the current rows is written: one bulk
+    delete for removed ids and one bulk insert for new ones. Ids that do not
+    exist on the target model are ignored. Returns ``(added, removed)``.
+    """
+    wanted = set(
+        manager.model.objects.filter(pk__in=_clean_ids(raw_ids)).values_list('pk', flat=True)
+    )
+    current = set(manager.values_list('pk', flat=True))
+    added = wanted - current
+    removed = current - wanted
+    if not (added or removed):
+        return added, removed
+
+    with transaction.atomic():
+        if removed:
+            manager.remove(*removed)
+        if added:
+            manager.add(*added)
+    return added, removed
+
+
+MEMBERSHIP_BATCH_SIZE = 500
+
+
+def _batches(ids, size=MEMBERSHIP_BATCH_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _send_membership_changed(group, action, user_ids):
+    # 與 group.user_set.add()/remove() 發出相同的 m2m_changed 訊號
+    m2m_changed.send(
+        sender=User.groups.through, instance=group, action=action, reverse=True,
+        model=User, pk_set=set(user_ids), using=group._state.db,
+    )
+
+
+def add_group_members(group, user_ids):
+    """
+    Add users to ``group`` in batches inside one transaction.
+
+    Each batch costs one lookup of valid, not-yet-member users and one bulk
+    insert into the through table. Returns the number of users added.
+    """
+    through = User.groups.through
+    added = 0
+    with transaction.atomic():
+        for batch in _batches(sorted(_clean_ids(user_ids))):
+            new_ids = list(
+                User.objects.filter(pk__in=batch).exclude(groups=group).values_list('pk', flat=True)
+            )
+            if not new_ids:
+                continue
+            _send_membership_changed(group, 'pre_add', new_ids)
+            through.objects.bulk_create(
+                [through(user_id=user_id, group_id=group.pk) for user_id in new_ids],
+                ignore_conflicts=True,
+            )
+            _send_membership_changed(group, 'post_add', new_ids)
+            added += len(new_ids)
+    return added
+
+
+def remove_group_members(group, user_ids):
+    """Remove users from ``group`` with one DELETE per batch. Returns the number removed."""
+    through = User.groups.through
+    removed = 0
+    with transaction.atomic():
+        for batch in _batches(sorted(_clean_ids(user_ids))):
+            rows = through.objects.filter(group_id=group.pk, user_id__in=batch)
+            member_ids = list(rows.values_list('user_id', flat=True))
+            if not member_ids:
+                continue
+            _send_membership_changed(group, 'pre_remove', member_ids)
+            rows.filter(user_id__in=member_ids).delete()
+            _send_membership_changed(group, 'post_remove', member_ids)
+            removed += len(member_ids)
+    return removed
+
+
+def add_employees_to_group(group, department_id=None, job_title_id=None):
+    """Add every employee under a department and/or with a job title to ``group``."""
+    if not (department_id or job_title_id):
+        return 0
+    employees = Employee.objects.all()
+    if department_id:
+        employees = employees.under(department_id)
+    if job_title_id:
+        employees = employees.filter(job_title_id=job_title_id)
+    return add_group_members(group, employees.values_list('user_id', flat=True))
+
+
+# 員工的批次調整：可改為同一個值的外鍵欄位與對應的模型
+REASSIGNABLE_FIELDS = {
+    'department': Department,
+    'job_title': JobTitle,
+}
+
+
+def reassign_employees(employees, field, target):
+    """
+    Point ``field`` of every employee in ``employees`` at ``target`` with one UPDATE.
+
+    Employees already assigned to ``target`` are left alone. Headcounts move
+    with one statement per table and only the changed rows are re-indexed.
+    Returns the number of employees changed.
+    """
+    model = REASSIGNABLE_FIELDS[field]
+    column = COUNTED_FIELDS.index(f'{field}_id')
+    changed = employees.exclude(**{field: target})
+    with transaction.atomic():
+        rows = list(changed.values_list('pk', 'id_number', *COUNTED_FIELDS))
+        if not rows:
+            return 0
+        changed.update(**{field: target, 'updated_at': timezone.now()})
+        counted = [row[2:] for row in rows]
+        deltas = Counter()
+        for values in counted:
+            deltas[values[column]] -= 1
+        deltas[target.pk] += len(rows)
+        model.objects.adjust_headcounts(deltas)
+        adjust_snapshot(counted, [(*values[:column], target.pk, *values[column + 1:]) for values in counted])
+        index_employees(row[0] for row in rows)
+        bump_versions('employee')
+        record_events(
+            audit_event('employee.update', 'employee', row[0], row[1],
+                        {f'{field}_id': [row[2 + column], target.pk]})
+            for row in rows
+        )
+    return len(rows)
+
+
+_bulk_delete = ContextVar('accounts_bulk_delete', default=False)
+
+
+def in_bulk_delete():
+    """True while ``delete_employees`` runs; per-row delete receivers leave the work to it."""
+    return _bulk_delete.get()
+
+
+def delete_employees(employees):
+    """
+    Delete ``employees`` and their users with one cascade collector run.
+
+    The per-row ``post_delete`` bookkeeping (headcounts, search index,
+    fragment and auth versions, audit events) is replaced by one aggregated
+    update of each. Returns the number of employees deleted.
+    """
+    with transaction.atomic():
+        rows = list(employees.values_list('pk', 'id_number', *COUNTED_FIELDS))
+        if not rows:
+            return 0
+        token = _bulk_delete.set(True)
+        try:
+            User.objects.filter(pk__in=employees.values('user_id')).delete()
+        finally:
+            _bulk_delete.reset(token)
+        for model, column in ((Department, 2), (JobTitle, 3)):
+            counts = Counter(row[column] for row in rows)
+            model.objects.adjust_headcounts({pk: -count for pk, count in counts.items()})
+        adjust_snapshot(removed=[row[2:] for row in rows])
+        remove_employees(row[0] for row in rows)
+        bump_versions('employee', 'user')
+        # 被刪除用戶的登入快照一併失效
+        bump_auth_version()
+        record_events(audit_event('employee.delete', 'employee', row[0], row[1]) for row in rows)
+    return len(rows)
@@ -0,0 +1,244 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.auth.signals import user_logged_out
+from django.contrib.contenttypes.models import ContentType
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .analytics import COUNTED_FIELDS, adjust_snapshot
+from .audit import record
+from .backends import bump_auth_version, bump_user_versions
+from .catalog import invalidate_permission_tree
+from .fragments import bump_versions
+from .hierarchy import detach_children, sync_department
+from .metrics import install_query_hook
+from .models import Department, Employee, HeadcountSnapshot, JobTitle
+from .search import create_search_table, index_employees, remove_employees
+from .services import in_bulk_delete
+
+
+# 權限目錄快取：遷移後或權限/內容類型變動時失效
+@receiver(post_migrate)
+@receiver([post_save, post_delete], sender=Permission)
+@receiver([post_save, post_delete], sender=ContentType)
+def permission_catalog_changed(**kwargs):
+    invalidate_permission_tree()
+
+
+# 員工搜尋索引同步
+SEARCH_USER_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+@receiver(post_migrate)
+def create_search_index(sender, **kwargs):
+    if sender.name == 'accounts':
+        create_search_table()
+
+
+@receiver(post_migrate)
+def backfill_usernames(sender, **kwargs):
+    # 新增 Employee.username 欄位後補上既有員工的用戶名
+    if sender.name == 'accounts':
+        Employee.objects.sync_usernames()
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_employees([instance.pk])
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    # 批次刪除時由 delete_employees() 一次彙總處理
+    if in_bulk_delete():
+        return
+    remove_employees([instance.pk])
+    # 與刪除在同一個交易中扣除人數
+    Department.objects.adjust_headcounts({instance.department_id: -1})
+    JobTitle.objects.adjust_headcounts({instance.job_title_id: -1})
+    adjust_snapshot(removed=[tuple(getattr(instance, field) for field in COUNTED_FIELDS)])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # 登入時只更新 last_login，不需重建索引
+    if raw or created or (update_fields and not set(update_fields) & SEARCH_USER_FIELDS):
+        return
+    # 員工列表依用戶名排序時使用 Employee.username 副本
+    if not update_fields or 'username' in update_fields:
+        Employee.objects.filter(user_id=instance.pk).exclude(username=instance.username).update(
+            username=instance.username,
+        )
+    index_employees(Employee.objects.filter(user_id=instance.pk).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_save, sender=JobTitle)
+def reference_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    field = 'department' if sender is Department else 'job_title'
+    index_employees(Employee.objects.filter(**{field: instance}).values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Department)
+@receiver(pre_delete, sender=JobTitle)
+def reference_deleting(sender, instance, **kwargs):
+    # 刪除後員工的外鍵會被設為 NULL，先記下受影響的員工
+    field = 'department' if sender is Department else 'job_title'
+    instance._search_employee_ids = list(
+        Employee.objects.filter(**{field: instance}).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=JobTitle)
+def reference_deleted(sender, instance, **kwargs):
+    index_employees(getattr(instance, '_search_employee_ids', []))
+    # 員工的外鍵已設為 NULL，統計快照中的人數併入「未分配」
+    HeadcountSnapshot.objects.merge('department_id' if sender is Department else 'job_title_id', instance.pk)
+
+
+# 部門階層的閉包表同步
+@receiver(post_save, sender=Department)
+def department_saved(sender, instance, created=False, **kwargs):
+    sync_department(instance, created=created)
+
+
+@receiver(pre_delete, sender=Department)
+def department_deleting(sender, instance, **kwargs):
+    # 下層部門的 parent 會被設為 NULL，先把它們從這個部門的階層中移出
+    detach_children(instance)
+
+
+# 列表片段快取：資料變動時遞增對應模型的版本號
+FRAGMENT_VERSIONS = {
+    Department: 'department',
+    JobTitle: 'jobtitle',
+    Employee: 'employee',
+    User: 'user',
+    Group: 'group',
+}
+# 只有這些 User 欄位會出現在列表中
+LISTED_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_save, sender=JobTitle)
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+def fragment_source_saved(sender, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if sender is User and update_fields and not set(update_fields) & LISTED_USER_FIELDS:
+        return
+    bump_versions(FRAGMENT_VERSIONS[sender])
+
+
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=JobTitle)
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def fragment_source_deleted(sender, **kwargs):
+    if in_bulk_delete():
+        return
+    bump_versions(FRAGMENT_VERSIONS[sender])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def fragment_relation_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_versions('group')
+
+
+# 登入用戶快照：用戶、個人權限、群組成員或群組權限變動時失效
+@receiver(post_save, sender=User)
+def auth_user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # 登入時只更新 last_login，快照不需重建；改密碼、停用帳號等其他儲存都立即失效
+    if raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    bump_user_versions(instance.pk)
+
+
+@receiver(user_logged_out)
+def auth_user_logged_out(sender, user=None, **kwargs):
+    # 登出後不保留快照，下次登入重新讀取
+    if user is not None and user.pk is not None:
+        bump_user_versions(user.pk)
+
+
+@receiver(post_delete, sender=User)
+def auth_user_deleted(sender, instance, **kwargs):
+    if in_bulk_delete():
+        return
+    bump_user_versions(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def auth_user_relation_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, User):
+        bump_user_versions(instance.pk)
+    else:
+        # 從群組或權限一側修改，影響的用戶可能很多，改為全部失效
+        bump_auth_version()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def auth_group_permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_auth_version()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def auth_source_deleted(sender, **kwargs):
+    bump_auth_version()
+
+
+# 稽核紀錄：群組成員、群組權限與個人權限的增減，以及員工的新增與刪除
+AUDITED_RELATIONS = {
+    (User.groups.through, False): ('user', 'groups'),
+    (User.groups.through, True): ('group', 'members'),
+    (User.user_permissions.through, False): ('user', 'permissions'),
+    (Group.permissions.through, False): ('group', 'permissions'),
+}
+AUDITED_RELATION_ACTIONS = {'post_add': 'added', 'post_remove': 'removed'}
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def audit_relation_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    relation = AUDITED_RELATIONS.get((sender, reverse))
+    if relation is None or action not in AUDITED_RELATION_ACTIONS or not pk_set:
+        return
+    target_type, field = relation
+    record(f'{target_type}.{field}', target_type, instance.pk, instance,
+           {AUDITED_RELATION_ACTIONS[action]: sorted(pk_set)})
+
+
+@receiver(post_save, sender=Employee)
+def audit_employee_saved(sender, instance, created=False, raw=False, **kwargs):
+    # 修改由 employee_edit 與批次操作記錄欄位差異
+    if created and not raw:
+        record('employee.create', 'employee', instance.pk, instance.id_number)
+
+
+@receiver(post_delete, sender=Employee)
+def audit_employee_deleted(sender, instance, **kwargs):
+    if in_bulk_delete():
+        return
+    record('employee.delete', 'employee', instance.pk, instance.id_number)
+
+
+# 請求指標：每條新開啟的連線都掛上查詢記錄器
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_query_hook(connection)
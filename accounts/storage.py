@@ -0,0 +1,30 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.functional import cached_property
+
+from .assets import compress_file
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ``ManifestStaticFilesStorage`` that also writes ``.gz`` and ``.br``
+    variants of every hashed file during ``collectstatic``.
+
+    Hashed names change with their content, so they can be served with a
+    far-future ``Cache-Control`` and the compressed variants never go stale.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # 只壓縮 manifest 中的最終檔名，多輪處理的中間檔不需要
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            compress_file(self.path(hashed_name))
+
+    @cached_property
+    def hashed_names(self):
+        return frozenset(self.hashed_files.values())
+
+    def is_hashed(self, name):
+        """True when ``name`` is a content-hashed file listed in the manifest."""
+        return name in self.hashed_names
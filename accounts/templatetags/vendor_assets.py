@@ -0,0 +1,16 @@
+from django import template
+from django.utils.html import format_html
+
+from ..assets import VENDOR_ASSETS, vendor_asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_asset(name):
+    """``<link>`` or ``<script>`` for a vendor asset; local once vendored, the pinned CDN URL otherwise."""
+    url, integrity = vendor_asset_url(name)
+    attributes = format_html(' integrity="{}" crossorigin="anonymous"', integrity) if integrity else ''
+    if VENDOR_ASSETS[name].kind == 'css':
+        return format_html('<link href="{}" rel="stylesheet"{}>', url, attributes)
+    return format_html('<script src="{}"{}></script>', url, attributes)
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from accounts.catalog import REFERENCE_TABLES
+from accounts.seed import CompanySeeder
+
+
+def reset_caches():
+    """Empty the shared cache and the per-process reference tables, as in a freshly started worker."""
+    for cache in caches.all():
+        cache.clear()
+    for table in REFERENCE_TABLES.values():
+        table.clear()
+
+
+def seed_company(employees, departments=4, groups=2, seed=0):
+    """Replace any previously seeded company with a new one of ``employees`` rows."""
+    seeder = CompanySeeder(employees=employees, departments=departments, groups=groups, seed=seed)
+    seeder.remove_existing(force=True)
+    return seeder.run()
+
+
+class AdminTestCase(TestCase):
+    """Logged in as a superuser, starting every test with empty caches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        reset_caches()
+        self.client.force_login(self.admin)
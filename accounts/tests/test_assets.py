@@ -0,0 +1,53 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.checks import run_checks
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from accounts import assets
+
+MISSING = assets.VendorAsset('missing-1.0/missing.js', 'https://cdn.example.com/missing.js')
+
+
+class VendorAssetTagTests(SimpleTestCase):
+    def setUp(self):
+        assets._is_vendored.cache_clear()
+        self.addCleanup(assets._is_vendored.cache_clear)
+
+    def render(self, name):
+        return Template('{% load vendor_assets %}{% vendor_asset "' + name + '" %}').render(Context())
+
+    @override_settings(DEBUG=True)
+    def test_links_local_file_once_vendored(self):
+        asset = assets.VENDOR_ASSETS['jquery.js']
+        with tempfile.TemporaryDirectory() as static_dir, override_settings(STATICFILES_DIRS=[static_dir]):
+            path = os.path.join(static_dir, *asset.path.split('/'))
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as output:
+                output.write('/* jquery */')
+            html = self.render('jquery.js')
+        self.assertIn(f'src="/static/{asset.path}"', html)
+        self.assertIn(f'integrity="{asset.integrity}"', html)
+
+    def test_falls_back_to_pinned_cdn(self):
+        with mock.patch.object(assets, '_is_vendored', return_value=False):
+            jquery = self.render('jquery.js')
+            bootstrap = self.render('bootstrap.css')
+        self.assertIn(f'src="{assets.VENDOR_ASSETS["jquery.js"].url}"', jquery)
+        self.assertIn(f'integrity="{assets.VENDOR_ASSETS["jquery.js"].integrity}" crossorigin="anonymous"', jquery)
+        self.assertIn(f'href="{assets.VENDOR_ASSETS["bootstrap.css"].url}"', bootstrap)
+
+
+class VendorAssetCheckTests(SimpleTestCase):
+    def test_deploy_check_lists_cdn_assets(self):
+        with mock.patch.object(assets, 'VENDOR_FILES', [*assets.VENDOR_FILES, MISSING]):
+            self.assertFalse([m for m in run_checks(tags=['staticfiles']) if m.id.startswith('accounts.')])
+            warnings = run_checks(tags=['staticfiles'], include_deployment_checks=True)
+        self.assertIn(('accounts.W001', True), [(w.id, MISSING.path in w.msg) for w in warnings])
+
+    def test_nothing_reported_when_every_file_is_found(self):
+        with mock.patch.object(assets.finders, 'find', return_value='/found'):
+            messages = run_checks(tags=['staticfiles'], include_deployment_checks=True)
+        self.assertFalse([m for m in messages if m.id.startswith('accounts.')])
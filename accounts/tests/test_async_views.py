@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, TestCase
+
+from accounts import async_views
+from accounts.models import Department, Employee
+from accounts.views import EMPLOYEE_PAGE_SIZE
+
+from .base import reset_caches, seed_company
+
+
+class AsyncEmployeeListTests(TestCase):
+    """The async employee list never queries the database from the event loop."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        seed_company(30, departments=6)
+        # 各部門（含下層部門）依預設排序的員工帳號
+        cls.expected = {
+            department.pk: list(
+                Employee.objects.under(department.pk).order_by('username').values_list('username', flat=True)
+            )
+            for department in Department.objects.all()
+        }
+        cls.usernames = set(Employee.objects.values_list('username', flat=True))
+
+    def setUp(self):
+        reset_caches()
+
+    async def get(self, **params):
+        request = AsyncRequestFactory().get('/accounts/employees/', params)
+
+        async def auser():
+            return self.admin
+
+        request.auser = auser
+        return await async_views.employee_list(request)
+
+    async def test_department_filter(self):
+        for department_id, usernames in self.expected.items():
+            with self.subTest(department=department_id):
+                response = await self.get(department=str(department_id))
+                self.assertEqual(response.status_code, 200)
+                shown = {username for username in self.usernames if username in response.content.decode()}
+                self.assertEqual(shown, set(usernames[:EMPLOYEE_PAGE_SIZE]))
@@ -0,0 +1,66 @@
+import pickle
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.backends import CachedModelBackend, _cache, _snapshot_key
+
+from .base import AdminTestCase
+
+
+class CachedModelBackendTests(AdminTestCase):
+    def get(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(reverse('permissions_panel'))
+
+    def save(self, user, **fields):
+        for name, value in fields.items():
+            setattr(user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+    def test_snapshot_has_no_password(self):
+        self.assertEqual(self.get().status_code, 200)
+        versions, snapshot = _cache().get(_snapshot_key(self.admin.pk))
+        self.assertNotIn('password', snapshot['fields'])
+        self.assertNotIn(self.admin.password.encode(), pickle.dumps(snapshot))
+
+    def test_cached_user_runs_no_queries(self):
+        self.get()
+        backend = CachedModelBackend()
+        with self.assertNumQueries(0):
+            user = backend.get_user(self.admin.pk)
+            self.assertEqual(user.username, 'admin')
+            self.assertTrue(user.has_perm('auth.change_group'))
+            self.assertEqual(user.get_session_auth_hash(), self.admin.get_session_auth_hash())
+
+    def test_saving_cached_user_keeps_password(self):
+        self.get()
+        user = CachedModelBackend().get_user(self.admin.pk)
+        self.save(user, first_name='Ada')
+        self.admin.refresh_from_db()
+        self.assertEqual(self.admin.first_name, 'Ada')
+        self.assertTrue(self.admin.check_password('password'))
+
+    def test_password_change_ends_session(self):
+        self.get()
+        admin = User.objects.get(pk=self.admin.pk)
+        admin.set_password('changed')
+        self.save(admin)
+        self.assertFalse(self.get().wsgi_request.user.is_authenticated)
+
+    def test_deactivation_ends_session(self):
+        self.get()
+        self.save(User.objects.get(pk=self.admin.pk), is_active=False)
+        self.assertFalse(self.get().wsgi_request.user.is_authenticated)
+
+    def test_logout_drops_snapshot(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('logout'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNotNone(CachedModelBackend().get_user(self.admin.pk))
+        # 快照失效，重新讀取用戶
+        self.assertIn('FROM "auth_user"', queries.captured_queries[0]['sql'])
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import F
+from django.db.utils import ConnectionHandler
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts import search
+from accounts.models import Department
+from auth_project.routers import REPLICA_DB_ALIAS
+
+from .base import reset_caches, seed_company
+
+WRITERS = 4
+# 每個寫入交易持有鎖的秒數與測試秒數
+HOLD = 0.3
+DURATION = 2
+LIST_URLS = ('employee_list', 'department_list')
+
+
+@override_settings(DATABASE_ROUTERS=['auth_project.routers.PrimaryReplicaRouter'])
+class ConcurrentWriteTests(TransactionTestCase):
+    """
+    List views read through ``PrimaryReplicaRouter`` while writers hold
+    ``IMMEDIATE`` transactions, on a file-backed database opened like the
+    production profile.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+        self.handler = ConnectionHandler({
+            DEFAULT_DB_ALIAS: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': path,
+                'OPTIONS': settings.SQLITE_PRODUCTION_OPTIONS,
+            },
+            REPLICA_DB_ALIAS: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': f'file:{path}?mode=ro',
+                'OPTIONS': settings.SQLITE_REPLICA_OPTIONS,
+            },
+        })
+        # 本執行緒改用暫存資料庫的兩條連線，測試結束後換回測試資料庫
+        test_connection = connections[DEFAULT_DB_ALIAS]
+        self.addCleanup(setattr, search, '_backend', None)
+        self.addCleanup(connections.__setitem__, DEFAULT_DB_ALIAS, test_connection)
+        self.connect(DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS)
+        self.addCleanup(self.disconnect, DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS)
+
+        call_command('migrate', run_syncdb=True, verbosity=0, interactive=False)
+        search._backend = None
+        seed_company(40, departments=6)
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        self.department_id = Department.objects.values_list('pk', flat=True).first()
+
+    def connect(self, *aliases):
+        # 每個執行緒各自開啟連線
+        for alias in aliases:
+            connections[alias] = self.handler.create_connection(alias)
+
+    def disconnect(self, *aliases):
+        for alias in aliases:
+            connections[alias].close()
+        if REPLICA_DB_ALIAS in aliases:
+            del connections[REPLICA_DB_ALIAS]
+
+    def test_list_views_read_from_replica_while_writers_hold_locks(self):
+        deadline = time.monotonic() + DURATION
+        errors, commits = [], []
+
+        def write():
+            self.connect(DEFAULT_DB_ALIAS)
+            try:
+                while time.monotonic() < deadline:
+                    with transaction.atomic():
+                        Department.objects.filter(pk=self.department_id).update(headcount=F('headcount'))
+                        time.sleep(HOLD)
+                    commits.append(1)
+            except OperationalError as e:
+                errors.append(str(e))
+            finally:
+                self.disconnect(DEFAULT_DB_ALIAS)
+
+        threads = [threading.Thread(target=write) for _ in range(WRITERS)]
+        for thread in threads:
+            thread.start()
+        timings = []
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica_queries, \
+                CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary_queries:
+            while time.monotonic() < deadline:
+                for name in LIST_URLS:
+                    # 每次都清空快取，列表實際查詢資料庫
+                    reset_caches()
+                    started = time.perf_counter()
+                    response = self.client.get(reverse(name))
+                    timings.append(time.perf_counter() - started)
+                    self.assertEqual(response.status_code, 200)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreaterEqual(len(commits), WRITERS)
+        # 列表的查詢都由唯讀連線執行，不等待寫入交易
+        for table in ('accounts_employee', 'accounts_department'):
+            self.assertTrue([query for query in replica_queries if f'FROM "{table}"' in query['sql']], table)
+            self.assertFalse([query for query in primary_queries if f'FROM "{table}"' in query['sql']], table)
+        self.assertLess(max(timings), HOLD)
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
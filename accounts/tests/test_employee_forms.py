@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.contrib.messages import get_messages
+from django.urls import reverse
+
+from accounts.analytics import age_band
+from accounts.models import Employee, HeadcountSnapshot
+
+from .base import AdminTestCase
+
+
+class EmployeeFormTests(AdminTestCase):
+    def post_create(self, **data):
+        return self.client.post(reverse('employee_create'), {
+            'username': 'lin', 'password': 'secret-123', 'email': 'lin@example.com',
+            'first_name': '小美', 'last_name': '林', 'id_number': 'F223456789', 'gender': 'F', **data,
+        })
+
+    def snapshot(self):
+        return dict(
+            HeadcountSnapshot.objects.filter(count__gt=0).values_list('age_band', 'count')
+        )
+
+    def test_create_and_edit_with_birth_date(self):
+        response = self.post_create(birth_date='1990-05-01')
+        self.assertRedirects(response, reverse('employee_list'))
+        employee = Employee.objects.get(user__username='lin')
+        self.assertEqual(employee.birth_date, date(1990, 5, 1))
+        self.assertEqual(self.snapshot(), {age_band(date(1990, 5, 1)): 1})
+
+        response = self.client.post(reverse('employee_edit', args=[employee.id]), {
+            'email': 'lin@example.com', 'first_name': '小美', 'last_name': '林',
+            'id_number': 'F223456789', 'gender': 'F', 'birth_date': '2005-01-01',
+        })
+        self.assertRedirects(response, reverse('employee_list'))
+        employee.refresh_from_db()
+        self.assertEqual(employee.birth_date, date(2005, 1, 1))
+        self.assertEqual(self.snapshot(), {age_band(date(2005, 1, 1)): 1})
+
+    def test_invalid_birth_date_is_rejected(self):
+        response = self.post_create(birth_date='1990-02-31')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('格式不正確', ' '.join(str(message) for message in get_messages(response.wsgi_request)))
+        self.assertFalse(Employee.objects.exists())
+        self.assertEqual(self.snapshot(), {})
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import DepartmentClosure, Employee
+from accounts.pagination import KeysetPaginator
+from accounts.views import EMPLOYEE_SORT_FIELDS
+
+from .base import seed_company
+
+
+class EmployeeListPlanTests(TestCase):
+    """Every sort and equality filter of the employee list is read in index order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_company(60, departments=6)
+        job_title = (
+            Employee.objects.exclude(job_title=None).values_list('job_title_id', flat=True)
+            .annotate(total=Count('pk')).order_by('-total').first()
+        )
+        leaf = (
+            DepartmentClosure.objects.filter(depth__gt=0).values('ancestor_id')
+        )
+        cls.filters = {
+            'none': {},
+            'gender': {'gender': 'F'},
+            'job_title': {'job_title': str(job_title)},
+            'leaf department': {'department': str(
+                Employee.objects.exclude(department=None).exclude(department__in=leaf)
+                .values_list('department_id', flat=True).first()
+            )},
+        }
+
+    def page_query(self, paginator, cursor=None):
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(cursor)
+        return page, queries.captured_queries[-1]['sql']
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def test_pages_do_not_sort(self):
+        for name, filters in self.filters.items():
+            for sort in EMPLOYEE_SORT_FIELDS.values():
+                for order_field in (sort, f'-{sort}'):
+                    with self.subTest(filters=name, order=order_field):
+                        paginator = KeysetPaginator(
+                            Employee.objects.filtered(**filters).for_listing(), order_field, per_page=5,
+                        )
+                        page, sql = self.page_query(paginator)
+                        self.assertTrue(page.has_next)
+                        self.assertNotIn('TEMP B-TREE', self.query_plan(sql))
+                        _, sql = self.page_query(paginator, page.next_cursor)
+                        plan = self.query_plan(sql)
+                        self.assertNotIn('TEMP B-TREE', plan)
+                        self.assertNotIn('SCAN', plan.split('\n')[0])
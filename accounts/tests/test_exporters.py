@@ -0,0 +1,42 @@
+import csv
+import io
+import zipfile
+
+from django.urls import reverse
+
+from accounts.exporters import stream_csv, stream_xlsx
+from accounts.models import Employee
+from accounts.views import EMPLOYEE_SEARCH_LIMIT
+
+from .base import AdminTestCase, seed_company
+
+
+class ExportTests(AdminTestCase):
+    def export(self, **params):
+        response = self.client.get(reverse('employee_export'), params)
+        self.assertEqual(response.status_code, 200)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+
+    def test_export_applies_search(self):
+        seed_company(10)
+        employee = Employee.objects.select_related('user').order_by('id').last()
+        rows = self.export(q=employee.id_number)
+        self.assertEqual([row[0] for row in rows[1:]], [employee.user.username])
+        self.assertEqual(len(self.export()), 11)
+
+    def test_search_export_is_not_capped(self):
+        seed_company(EMPLOYEE_SEARCH_LIMIT + 20)
+        rows = self.export(q='example.com')
+        self.assertEqual(len(rows) - 1, EMPLOYEE_SEARCH_LIMIT + 20)
+
+    def test_formulas_are_escaped(self):
+        rows = [('=HYPERLINK("http://example.com")', '+1', '-2', '@SUM(A1)', '\tx', '\rx', 'safe', -3)]
+        lines = list(csv.reader(io.StringIO(''.join(stream_csv(['a'] * 8, rows)).lstrip('\ufeff'))))
+        self.assertEqual(lines[1], [
+            '\'=HYPERLINK("http://example.com")', "'+1", "'-2", "'@SUM(A1)", "'\tx", "'\rx", 'safe', '-3',
+        ])
+        with zipfile.ZipFile(io.BytesIO(b''.join(stream_xlsx(['a'] * 8, rows)))) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('>\'=HYPERLINK', sheet)
+        self.assertIn('<v>-3</v>', sheet)
+        self.assertNotIn('>=HYPERLINK', sheet)
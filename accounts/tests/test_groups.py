@@ -0,0 +1,33 @@
+from django.contrib.auth.models import Group
+from django.contrib.messages import get_messages
+from django.urls import reverse
+
+from accounts.models import Department, Employee
+
+from .base import AdminTestCase, seed_company
+
+
+class GroupMembersTests(AdminTestCase):
+    def setUp(self):
+        super().setUp()
+        seed_company(20)
+        self.group = Group.objects.create(name='Reviewers')
+        self.url = reverse('group_members', args=[self.group.pk])
+
+    def test_add_employees_by_department(self):
+        department = Department.objects.filter(employees__isnull=False).first()
+        response = self.client.post(self.url, {'action': 'add_employees', 'department': department.pk})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(
+            set(self.group.user_set.values_list('id', flat=True)),
+            set(Employee.objects.under(department.pk).values_list('user_id', flat=True)),
+        )
+
+    def test_add_employees_rejects_invalid_ids(self):
+        missing = Department.objects.order_by('-pk').first().pk + 1
+        for data in ({'department': 'abc'}, {'department': missing}, {'job_title': '1; DROP'}):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, {'action': 'add_employees', **data})
+                self.assertRedirects(response, self.url)
+                self.assertIn('does not exist', ' '.join(str(m) for m in get_messages(response.wsgi_request)))
+                self.assertFalse(self.group.user_set.exists())
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from accounts.importers import EmployeeImporter
+from accounts.models import Employee
+
+
+def rows(count, start=0):
+    for index in range(start, start + count):
+        yield index + 2, {
+            'username': f'import{index}', 'password': 'secret-123',
+            'id_number': f'A1{index:08d}', 'gender': 'M',
+        }
+
+
+@override_settings(ACCOUNTS_IMPORT_PROCESS_THRESHOLD=4, ACCOUNTS_IMPORT_MAX_WORKERS=2)
+class ImporterPoolTests(TestCase):
+    def pool(self):
+        return mock.patch(
+            'accounts.importers.ProcessPoolExecutor',
+            side_effect=lambda max_workers, initializer: ThreadPoolExecutor(max_workers),
+        )
+
+    def test_small_import_runs_in_process(self):
+        with self.pool() as pool:
+            result = EmployeeImporter(batch_size=2, workers=8).run(rows(4))
+        self.assertEqual(result.created, 4)
+        pool.assert_not_called()
+
+    def test_large_import_starts_one_capped_pool(self):
+        with self.pool() as pool:
+            result = EmployeeImporter(batch_size=2, workers=8).run(rows(9))
+        self.assertEqual(result.created, 9)
+        pool.assert_called_once()
+        self.assertEqual(pool.call_args.kwargs['max_workers'], 2)
+        self.assertTrue(Employee.objects.get(id_number='A100000008').user.check_password('secret-123'))
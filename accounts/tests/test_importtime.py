@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class ProfileImportsTests(SimpleTestCase):
+    """``profile_imports`` run the way CI runs it, as a separate process."""
+
+    def profile_imports(self, *args):
+        return subprocess.run(
+            [sys.executable, 'manage.py', 'profile_imports', '--top', '1', *args],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120,
+        )
+
+    def test_within_configured_budget(self):
+        # 不傳入 --budget-ms，以 ACCOUNTS_IMPORT_BUDGET_MS 為上限
+        result = self.profile_imports()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('啟動載入', result.stdout)
+
+    def test_fails_when_budget_exceeded(self):
+        result = self.profile_imports('--budget-ms', '1')
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('超出預算 1 ms', result.stderr)
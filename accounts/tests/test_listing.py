@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from accounts.listing import Records
+from accounts.models import Employee, EmployeeRow
+from accounts.pagination import KeysetPaginator
+
+from .base import seed_company
+
+
+class ListingRecordTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_company(12)
+
+    def test_rows_are_records(self):
+        records = Employee.objects.order_by('id').for_listing()
+        self.assertIsInstance(records, Records)
+        rows = list(records)
+        self.assertEqual(len(rows), 12)
+        self.assertIsInstance(rows[0], EmployeeRow)
+        employee = Employee.objects.select_related('user').order_by('id').first()
+        self.assertEqual((rows[0].id, rows[0].username), (employee.id, employee.user.username))
+
+    def test_filter_and_slice_keep_records(self):
+        records = Employee.objects.for_listing().filter(gender='F').order_by('-id')[:3]
+        self.assertTrue(all(isinstance(record, EmployeeRow) for record in records))
+        self.assertEqual(
+            [record.id for record in records],
+            list(Employee.objects.filter(gender='F').order_by('-id').values_list('id', flat=True)[:3]),
+        )
+
+    async def test_async_pages(self):
+        paginator = KeysetPaginator(Employee.objects.for_listing(), 'id', per_page=5)
+        first = await paginator.apage()
+        second = await paginator.apage(first.next_cursor)
+        self.assertIsInstance(first.object_list[0], EmployeeRow)
+        self.assertEqual(len(first) + len(second), 10)
+        self.assertLess(first.object_list[-1].id, second.object_list[0].id)
@@ -0,0 +1,41 @@
+from django.template.backends.django import Template
+from django.test import override_settings
+from django.urls import reverse
+
+from accounts.metrics import registry
+from accounts.middleware import QueryBudgetExceeded
+
+from .base import AdminTestCase, seed_company
+
+
+class RequestMetricsTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        seed_company(10)
+
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+
+    def test_streaming_queries_are_recorded_after_the_body(self):
+        response = self.client.get(reverse('employee_export'))
+        self.assertNotIn('Server-Timing', response)
+        before = response.request_metrics.queries
+        self.assertNotIn('view="employee_export"', registry.render())
+        b''.join(response.streaming_content)
+        self.assertGreater(response.request_metrics.queries, before)
+        self.assertIn('accounts_db_queries_count{view="employee_export"} 1', registry.render())
+
+    @override_settings(ACCOUNTS_QUERY_BUDGETS={'employee_export': 0}, ACCOUNTS_QUERY_BUDGET_STRICT=True)
+    def test_streaming_budget_is_checked_after_the_body(self):
+        response = self.client.get(reverse('employee_export'))
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+    def test_regular_responses_carry_server_timing(self):
+        response = self.client.get(reverse('employee_list'))
+        self.assertIn(f'desc="{response.request_metrics.queries} queries', response['Server-Timing'])
+
+    def test_templates_instrumented_at_startup(self):
+        self.assertEqual(Template.render.__module__, 'accounts.metrics')
@@ -0,0 +1,58 @@
+import io
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from PIL import Image
+
+from accounts.models import Employee
+from accounts.photos import PHOTO_THUMBNAIL_SIZES, derivative_name, queue_photo_processing, wait_for_photo_queue
+
+from .base import seed_company
+
+
+def png(size=(300, 200)):
+    output = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(output, format='PNG')
+    return output.getvalue()
+
+
+class PhotoQueueTests(TransactionTestCase):
+    """Derivatives are built on the background worker once the upload commits."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        seed_company(1, departments=1, groups=0)
+        self.employee = Employee.objects.get()
+
+    def test_derivatives_are_built_after_commit(self):
+        with transaction.atomic():
+            self.employee.photo.save('photo.png', ContentFile(png()))
+            queue_photo_processing(self.employee.pk)
+        wait_for_photo_queue()
+
+        photo_hash = Employee.objects.values_list('photo_hash', flat=True).get(pk=self.employee.pk)
+        self.assertEqual(len(photo_hash), 64)
+        for size in [*PHOTO_THUMBNAIL_SIZES, 'large']:
+            with default_storage.open(derivative_name(photo_hash, size)) as derivative, \
+                    Image.open(derivative) as image:
+                self.assertEqual(image.format, 'WEBP')
+                if size in PHOTO_THUMBNAIL_SIZES:
+                    self.assertEqual(image.size, (PHOTO_THUMBNAIL_SIZES[size],) * 2)
+
+    def test_nothing_is_queued_when_the_upload_rolls_back(self):
+        try:
+            with transaction.atomic():
+                queue_photo_processing(self.employee.pk)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.employee.photo.save('photo.png', ContentFile(png()))
+        wait_for_photo_queue()
+        self.assertEqual(Employee.objects.values_list('photo_hash', flat=True).get(pk=self.employee.pk), '')
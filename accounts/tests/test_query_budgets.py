@@ -0,0 +1,22 @@
+from django.test import TestCase, override_settings
+
+from accounts.benchmark import build_cases, run_benchmark
+
+from .base import reset_caches, seed_company
+
+
+@override_settings(ACCOUNTS_QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Every benchmark route stays within ``ACCOUNTS_QUERY_BUDGETS``, cold and warm."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_company(60, departments=6, groups=3)
+
+    def test_routes_within_budget(self):
+        for case in build_cases():
+            with self.subTest(case.name):
+                # 每個路由的第一個請求在快取全空時執行；嚴格模式下超出預算會拋出 QueryBudgetExceeded
+                reset_caches()
+                result = run_benchmark(iterations=1, host='testserver', cases=[case])['results'][case.name]
+                self.assertLess(result['status'], 400)
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Employee
+
+from .base import AdminTestCase, reset_caches, seed_company
+
+
+class QueryCountTests(AdminTestCase):
+    """The list and detail pages run the same number of queries for N and for 2N rows."""
+
+    rows = 25
+    groups = 2
+
+    def query_count(self, url):
+        reset_caches()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueriesIndependentOfRows(self, url_for):
+        # 第二次的員工與群組數都加倍以上，每個群組的成員也隨之增加
+        seed_company(self.rows, groups=self.groups)
+        expected = self.query_count(url_for())
+        seed_company(self.rows * 2, groups=self.groups * 3)
+        self.assertEqual(Employee.objects.count(), self.rows * 2)
+        self.assertEqual(Group.objects.count(), self.groups * 3)
+        url = url_for()
+        reset_caches()
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_employee_list(self):
+        self.assertQueriesIndependentOfRows(lambda: reverse('employee_list'))
+
+    def test_employee_list_filtered_and_sorted(self):
+        self.assertQueriesIndependentOfRows(lambda: f'{reverse("employee_list")}?gender=F&sort=-id_number')
+
+    def test_employee_detail(self):
+        self.assertQueriesIndependentOfRows(
+            lambda: reverse('employee_detail', args=[Employee.objects.order_by('pk').last().pk])
+        )
+
+    def test_permissions_panel(self):
+        self.assertQueriesIndependentOfRows(lambda: reverse('permissions_panel'))
+
+    def test_group_list(self):
+        self.assertQueriesIndependentOfRows(lambda: reverse('group_list'))
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts import search
+from accounts.models import Employee
+
+from .base import AdminTestCase
+
+
+class SearchTests(AdminTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.employees = {}
+        for username, id_number, last_name, first_name in (
+            ('wangming', 'A123456789', '王', '明'), ('wanda', 'B223456789', '李', ''),
+            ('chen', 'C123456789', '陳', ''), ('lin', 'D123456789', '林', '小明'), ('linfang', 'E223456789', '林', '芳'),
+        ):
+            user = User.objects.create_user(username, f'{username}@example.com', 'password',
+                                            last_name=last_name, first_name=first_name)
+            cls.employees[username] = Employee.objects.create(user=user, id_number=id_number, gender='M')
+
+    def ids(self, *usernames):
+        return sorted(self.employees[username].id for username in usernames)
+
+    def assertSearches(self, backend):
+        self.assertEqual(sorted(backend.search('wang', 10)), self.ids('wangming'))
+        self.assertEqual(sorted(backend.search('example 王', 10)), self.ids('wangming'))
+        # 短詞只比對用戶名與身份證號開頭
+        self.assertEqual(sorted(backend.search('wa', 10)), self.ids('wangming', 'wanda'))
+        self.assertEqual(sorted(backend.search('c1', 10)), self.ids('chen'))
+        # 一兩個字的中文姓名、姓氏或名字
+        self.assertEqual(sorted(backend.search('王', 10)), self.ids('wangming'))
+        self.assertEqual(sorted(backend.search('王明', 10)), self.ids('wangming'))
+        self.assertEqual(sorted(backend.search('林芳', 10)), self.ids('linfang'))
+        self.assertEqual(sorted(backend.search('小明', 10)), self.ids('lin'))
+        self.assertEqual(sorted(backend.search('明', 10)), self.ids('wangming', 'lin'))
+        self.assertEqual(sorted(backend.search('林 芳', 10)), self.ids('linfang'))
+        self.assertEqual(sorted(backend.search('林 li', 10)), self.ids('lin', 'linfang'))
+        self.assertEqual(backend.search('陳明', 10), [])
+
+    def test_fts_backend(self):
+        backend = search.get_backend()
+        self.assertIsInstance(backend, search.SQLiteFTSBackend)
+        self.assertSearches(backend)
+
+    def test_model_backend(self):
+        backend = search.ModelBackend()
+        backend.index(employee.id for employee in self.employees.values())
+        self.assertSearches(backend)
+
+    def test_short_terms_use_indexes(self):
+        for backend in (search.SQLiteFTSBackend(), search.ModelBackend()):
+            for query in ('wa', '林'):
+                with self.subTest(backend=type(backend).__name__, query=query):
+                    with CaptureQueriesContext(connection) as queries:
+                        backend.search(query, 10)
+                    with connection.cursor() as cursor:
+                        cursor.execute('EXPLAIN QUERY PLAN ' + queries.captured_queries[-1]['sql'])
+                        plan = [row[-1] for row in cursor.fetchall()]
+                    self.assertFalse(
+                        [step for step in plan if step.startswith('SCAN') and 'VIRTUAL TABLE' not in step], plan,
+                    )
+
+    def test_get_backend_does_not_create_tables(self):
+        with mock.patch.object(search, '_backend', None), CaptureQueriesContext(connection) as queries:
+            self.assertIsInstance(search.get_backend(), search.SQLiteFTSBackend)
+        self.assertFalse([query for query in queries.captured_queries if 'CREATE' in query['sql'].upper()])
+
+    def test_edit_indexes_employee_once(self):
+        employee = self.employees['chen']
+        with mock.patch.object(search.SQLiteFTSBackend, 'index', autospec=True) as index:
+            response = self.client.post(reverse('employee_edit', args=[employee.id]), {
+                'email': 'chen@example.org', 'first_name': '大文', 'last_name': '陳',
+                'id_number': employee.id_number, 'gender': 'M',
+            })
+        self.assertRedirects(response, reverse('employee_list'))
+        index.assert_called_once()
+        self.assertEqual(list(index.call_args.args[1]), [employee.id])
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from accounts.models import Department, Employee, JobTitle
+from accounts.seed import CompanySeeder
+
+from .base import seed_company
+
+
+class RemoveExistingTests(TestCase):
+    """``remove_existing()`` deletes only rows tagged by the seeder."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # 與產生器同名的正式資料
+        cls.department = Department.objects.create(name='財務部', description='財務部（測試資料）')
+        cls.job_title = JobTitle.objects.create(name='工程師', level=3)
+        cls.group = Group.objects.create(name='系統管理員')
+        cls.user = User.objects.create_user('seedling')
+        Employee.objects.create(user=cls.user, id_number='A123456789', gender='M')
+        seed_company(10)
+
+    def test_only_seeded_rows_are_removed(self):
+        CompanySeeder().remove_existing(force=True)
+        self.assertEqual(list(Department.objects.all()), [self.department])
+        self.assertEqual(list(JobTitle.objects.all()), [self.job_title])
+        self.assertEqual(list(Group.objects.all()), [self.group])
+        self.assertEqual(list(User.objects.all()), [self.user])
+        self.assertEqual(list(Employee.objects.values_list('user_id', flat=True)), [self.user.pk])
+
+    @override_settings(DEBUG=False)
+    def test_refuses_without_debug_or_force(self):
+        with self.assertRaises(ValueError):
+            CompanySeeder().remove_existing()
+        with self.assertRaisesMessage(CommandError, '--force'):
+            call_command('seed_company', '--replace', '--employees', '1', stdout=StringIO())
+        self.assertEqual(Department.objects.filter(name__startswith='seed-').count(), 4)
+
+    @override_settings(DEBUG=True)
+    def test_replace_in_debug(self):
+        call_command('seed_company', '--replace', '--employees', '3', '--departments', '2', '--groups', '1',
+                     stdout=StringIO())
+        self.assertEqual(Employee.objects.count(), 4)
+        self.assertTrue(Department.objects.filter(pk=self.department.pk).exists())
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.template import engines
+from django.test import TransactionTestCase, override_settings
+
+from accounts import search
+from accounts.assets import VENDOR_ASSETS, _is_vendored, vendor_asset_url
+from accounts.catalog import REFERENCE_TABLES, reference_data
+from accounts.warmup import WARMUP_STEPS, warm_up
+
+from .base import reset_caches
+
+
+class WarmUpTests(TransactionTestCase):
+    """``warm_up()`` leaves a new worker with the caches its first request would otherwise build."""
+
+    def setUp(self):
+        reset_caches()
+        ContentType.objects.clear_cache()
+        self.template_loader = engines['django'].engine.template_loaders[0]
+        self.template_loader.reset()
+        search._backend = None
+        self.addCleanup(setattr, search, '_backend', None)
+        _is_vendored.cache_clear()
+        self.addCleanup(_is_vendored.cache_clear)
+
+    def test_reports_every_step(self):
+        self.assertEqual([name for name, _ in warm_up()], [name for name, _ in WARMUP_STEPS])
+
+    def test_primes_templates(self):
+        warm_up()
+        self.assertIn('base.html', self.template_loader.get_template_cache)
+        self.assertIn('accounts/employee_form.html', self.template_loader.get_template_cache)
+
+    def test_primes_reference_data_content_types_and_search_backend(self):
+        warm_up()
+        self.assertIsNotNone(search._backend)
+        with self.assertNumQueries(0):
+            reference_data(*REFERENCE_TABLES)
+            ContentType.objects.get_for_model(ContentType)
+            search.get_backend()
+
+    def test_primes_static_manifest(self):
+        manifest = {'version': '1.1', 'hash': '', 'paths': {
+            asset.path: asset.path.replace('.', '.0123456789ab.', 1) for asset in VENDOR_ASSETS.values()
+        }}
+        with tempfile.TemporaryDirectory() as static_root, override_settings(
+            STATIC_ROOT=static_root,
+            STORAGES={**settings.STORAGES, 'staticfiles': {
+                'BACKEND': 'accounts.storage.CompressedManifestStaticFilesStorage'}},
+        ):
+            with open(f'{static_root}/staticfiles.json', 'w') as output:
+                json.dump(manifest, output)
+            # 已放入 STATIC_ROOT 的第三方檔案使用本機網址
+            for path in manifest['paths']:
+                os.makedirs(os.path.dirname(f'{static_root}/{path}'), exist_ok=True)
+                open(f'{static_root}/{path}', 'w').close()
+            warm_up()
+            with mock.patch.object(ManifestStaticFilesStorage, 'read_manifest',
+                                   side_effect=AssertionError('manifest read after warm-up')), \
+                    mock.patch.object(ManifestStaticFilesStorage, 'exists',
+                                      side_effect=AssertionError('vendored files checked after warm-up')):
+                url, _ = vendor_asset_url('bootstrap.css')
+            self.assertEqual(url, staticfiles_storage.base_url + manifest['paths'][VENDOR_ASSETS['bootstrap.css'].path])
@@ -1,14 +1,47 @@
-from django.urls import reverse_lazy
+import os
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
+
+from django.urls import reverse, reverse_lazy
 from django.views import generic
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse,
+)
 from django.contrib.auth.models import User, Group, Permission
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from .analytics import dashboard_data
+from .assets import content_type, precompressed_file
+from .audit import diff, record
+from .catalog import permission_tree, reference_data
+from .exporters import DATASETS, EXPORT_FORMATS
+from .fragments import cached_fragment, request_vary_on
 from .forms import CustomUserCreationForm
-from .models import Department, JobTitle, Employee
+from .hierarchy import HierarchyError, tree_order, validate_parent
+from .importers import IMPORT_COLUMNS, EmployeeImporter, read_rows
+from .metrics import registry
+from .models import AuditEvent, Department, JobTitle, Employee
+from .pagination import KeysetPaginator
+from .photos import queue_photo_processing
+from .search import deferred_indexing, search_employee_ids
+from .services import (
+    REASSIGNABLE_FIELDS, add_employees_to_group, add_group_members, delete_employees, group_summaries,
+    reassign_employees, remove_group_members, sync_relation,
+)
 
 class SignUpView(generic.CreateView):
     form_class = CustomUserCreationForm
@@ -22,10 +55,10 @@ def is_admin(user):
 @login_required
 @user_passes_test(is_admin)
 def permissions_panel(request):
-    users = User.objects.all().order_by('username')
-    groups = Group.objects.all().order_by('name')
+    users = User.objects.only('id', 'username', 'email', 'is_staff', 'is_superuser').order_by('username')
+    groups = group_summaries()
     content_types = ContentType.objects.all().order_by('app_label', 'model')
-    permissions = Permission.objects.all().order_by('content_type__app_label', 'codename')
+    permissions = Permission.objects.select_related('content_type').order_by('content_type__app_label', 'codename')
     
     context = {
         'users': users,
@@ -36,11 +69,14 @@ def permissions_panel(request):
     
     return render(request, 'accounts/permissions_panel.html', context)
 
+GROUP_TABLE_DEPENDS_ON = ('group', 'user')
+
 @login_required
 @user_passes_test(is_admin)
 def group_list(request):
-    groups = Group.objects.all().order_by('name')
-    return render(request, 'accounts/group_list.html', {'groups': groups})
+    table = cached_fragment(request, 'accounts/group_table.html', GROUP_TABLE_DEPENDS_ON,
+                            lambda: {'groups': group_summaries()})
+    return render(request, 'accounts/group_list.html', {'table': table})
 
 @login_required
 @user_passes_test(is_admin)
@@ -84,27 +120,19 @@ def group_delete(request, group_id):
 @login_required
 @user_passes_test(is_admin)
 def group_permissions(request, group_id):
-    group = get_object_or_404(Group, id=group_id)
-    group_permissions = group.permissions.all()
-    all_permissions = Permission.objects.all().order_by('content_type__app_label', 'codename')
+    group = get_object_or_404(group_summaries(), id=group_id)
     
     if request.method == 'POST':
-        # Clear existing permissions
-        group.permissions.clear()
-        
-        # Add selected permissions
-        permission_ids = request.POST.getlist('permissions')
-        for permission_id in permission_ids:
-            permission = Permission.objects.get(id=permission_id)
-            group.permissions.add(permission)
+        # 只寫入與現有權限的差異
+        sync_relation(group.permissions, request.POST.getlist('permissions'))
         
         messages.success(request, f'Permissions updated for group "{group.name}"')
         return redirect('group_list')
     
     context = {
         'group': group,
-        'group_permissions': group_permissions,
-        'all_permissions': all_permissions,
+        'permission_tree': permission_tree(),
+        'assigned_permission_ids': set(group.permissions.values_list('id', flat=True)),
     }
     
     return render(request, 'accounts/group_permissions.html', context)
@@ -112,42 +140,99 @@ def group_permissions(request, group_id):
 @login_required
 @user_passes_test(is_admin)
 def group_members(request, group_id):
-    group = get_object_or_404(Group, id=group_id)
-    group_members = User.objects.filter(groups=group).order_by('username')
-    all_users = User.objects.all().order_by('username')
+    group = get_object_or_404(group_summaries(), id=group_id)
+    group_members = User.objects.filter(groups=group).only('id', 'username', 'email').order_by('username')
+    non_members = User.objects.exclude(groups=group).only('id', 'username', 'email').order_by('username')
     
     if request.method == 'POST':
         action = request.POST.get('action')
         user_ids = request.POST.getlist('users')
         
         if action == 'add':
-            for user_id in user_ids:
-                user = User.objects.get(id=user_id)
-                user.groups.add(group)
-            messages.success(request, f'Users added to group "{group.name}" successfully')
+            added = add_group_members(group, user_ids)
+            messages.success(request, f'{added} users added to group "{group.name}" successfully')
         
         elif action == 'remove':
-            for user_id in user_ids:
-                user = User.objects.get(id=user_id)
-                user.groups.remove(group)
-            messages.success(request, f'Users removed from group "{group.name}" successfully')
+            removed = remove_group_members(group, user_ids)
+            messages.success(request, f'{removed} users removed from group "{group.name}" successfully')
+        
+        elif action == 'add_employees':
+            department_id = reference_choice_id(request.POST, 'department', 'department')
+            job_title_id = reference_choice_id(request.POST, 'job_title', 'jobtitle')
+            if (request.POST.get('department') and department_id is None) or (
+                    request.POST.get('job_title') and job_title_id is None):
+                messages.error(request, 'The selected department or job title does not exist')
+            elif department_id or job_title_id:
+                added = add_employees_to_group(group, department_id=department_id, job_title_id=job_title_id)
+                messages.success(request, f'{added} employees added to group "{group.name}" successfully')
+            else:
+                messages.error(request, 'Please select a department or a job title')
         
         return redirect('group_members', group_id=group.id)
     
+    departments, job_titles = reference_data('department', 'jobtitle')
     context = {
         'group': group,
         'group_members': group_members,
-        'all_users': all_users,
+        'non_members': non_members,
+        'departments': departments,
+        'job_titles': job_titles,
     }
     
     return render(request, 'accounts/group_members.html', context)
 
+# 匯出：逐列串流輸出，不將整個結果集載入記憶體
+def export_response(request, dataset, queryset=None):
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+    content_type, stream = EXPORT_FORMATS[export_format]
+    dataset = DATASETS[dataset]
+    response = StreamingHttpResponse(
+        stream(dataset.columns, dataset.rows(queryset)),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dataset.name}.{export_format}"'
+    return response
+
 # 部門管理視圖
+# 表格含人數，員工異動時也需重新渲染
+DEPARTMENT_TABLE_DEPENDS_ON = ('department', 'employee')
+
+def reference_choice_id(params, key, table):
+    # 表單送出的部門/職稱 ID；非數字或不存在時回傳 None
+    value = params.get(key, '')
+    choices, = reference_data(table)
+    if value.isdigit() and int(value) in {choice.id for choice in choices}:
+        return int(value)
+    return None
+
+def department_parent_id(request):
+    # 不存在的部門視為未選擇
+    return reference_choice_id(request.POST, 'parent', 'department')
+
+def department_form_context(department=None):
+    departments, = reference_data('department')
+    excluded = set()
+    if department is not None:
+        excluded = set(Department.objects.subtree(department.pk).values_list('id', flat=True))
+    return {
+        'department': department,
+        'parent_choices': [choice for choice in departments if choice.id not in excluded],
+    }
+
 @login_required
 @user_passes_test(is_admin)
 def department_list(request):
-    departments = Department.objects.all()
-    return render(request, 'accounts/department_list.html', {'departments': departments})
+    # 組織樹：一次查詢取得所有部門的深度與人數，再依上下層排列
+    table = cached_fragment(request, 'accounts/department_table.html', DEPARTMENT_TABLE_DEPENDS_ON,
+                            lambda: {'departments': tree_order(Department.objects.for_listing())})
+    return render(request, 'accounts/department_list.html', {'table': table})
+
+@login_required
+@user_passes_test(is_admin)
+def department_export(request):
+    return export_response(request, 'departments')
 
 @login_required
 @user_passes_test(is_admin)
@@ -156,12 +241,13 @@ def department_create(request):
         name = request.POST.get('name')
         description = request.POST.get('description')
         if name:
-            department = Department.objects.create(name=name, description=description)
+            department = Department.objects.create(name=name, description=description,
+                                                   parent_id=department_parent_id(request))
             messages.success(request, f'部門 "{name}" 創建成功')
             return redirect('department_list')
         else:
             messages.error(request, '部門名稱不能為空')
-    return render(request, 'accounts/department_form.html')
+    return render(request, 'accounts/department_form.html', department_form_context())
 
 @login_required
 @user_passes_test(is_admin)
@@ -170,15 +256,22 @@ def department_edit(request, department_id):
     if request.method == 'POST':
         name = request.POST.get('name')
         description = request.POST.get('description')
-        if name:
-            department.name = name
-            department.description = description
-            department.save()
-            messages.success(request, f'部門 "{name}" 更新成功')
-            return redirect('department_list')
-        else:
+        parent_id = department_parent_id(request)
+        if not name:
             messages.error(request, '部門名稱不能為空')
-    return render(request, 'accounts/department_form.html', {'department': department})
+        else:
+            try:
+                validate_parent(department, parent_id)
+            except HierarchyError as e:
+                messages.error(request, str(e))
+            else:
+                department.name = name
+                department.description = description
+                department.parent_id = parent_id
+                department.save()
+                messages.success(request, f'部門 "{name}" 更新成功')
+                return redirect('department_list')
+    return render(request, 'accounts/department_form.html', department_form_context(department))
 
 @login_required
 @user_passes_test(is_admin)
@@ -192,11 +285,19 @@ def department_delete(request, department_id):
     return render(request, 'accounts/department_confirm_delete.html', {'department': department})
 
 # 職稱管理視圖
+JOBTITLE_TABLE_DEPENDS_ON = ('jobtitle', 'employee')
+
 @login_required
 @user_passes_test(is_admin)
 def jobtitle_list(request):
-    jobtitles = JobTitle.objects.all()
-    return render(request, 'accounts/jobtitle_list.html', {'jobtitles': jobtitles})
+    table = cached_fragment(request, 'accounts/jobtitle_table.html', JOBTITLE_TABLE_DEPENDS_ON,
+                            lambda: {'jobtitles': JobTitle.objects.for_listing()})
+    return render(request, 'accounts/jobtitle_list.html', {'table': table})
+
+@login_required
+@user_passes_test(is_admin)
+def jobtitle_export(request):
+    return export_response(request, 'jobtitles')
 
 @login_required
 @user_passes_test(is_admin)
@@ -245,11 +346,223 @@ def jobtitle_delete(request, jobtitle_id):
     return render(request, 'accounts/jobtitle_confirm_delete.html', {'jobtitle': jobtitle})
 
 # 員工管理視圖
+def employee_filters(params):
+    return {
+        'department': params.get('department', ''),
+        'job_title': params.get('job_title', ''),
+        'gender': params.get('gender', ''),
+    }
+
+def employee_queryset(filters, query, limit=None):
+    # 列表、批次操作與匯出共用：篩選條件加上搜尋結果；limit=None 時包含所有符合的員工
+    employees = Employee.objects.filtered(**filters)
+    if query:
+        employees = employees.filter(pk__in=search_employee_ids(query, limit=limit))
+    return employees
+
+def employee_list_params(request):
+    filters = employee_filters(request.GET)
+    query = request.GET.get('q', '').strip()
+    
+    # 排序欄位，前綴 '-' 表示遞減
+    sort = request.GET.get('sort', 'username')
+    if sort.lstrip('-') not in EMPLOYEE_SORT_FIELDS:
+        sort = 'username'
+    order_field = EMPLOYEE_SORT_FIELDS[sort.lstrip('-')]
+    if sort.startswith('-'):
+        order_field = '-' + order_field
+    return filters, query, sort, order_field
+
+def employee_detail_data(employee):
+    return {
+        'id': employee.id,
+        'username': employee.user.username,
+        'email': employee.user.email,
+        'first_name': employee.user.first_name,
+        'last_name': employee.user.last_name,
+        'id_number': employee.id_number,
+        'gender': employee.gender,
+        'birth_date': employee.birth_date.isoformat() if employee.birth_date else None,
+        'department': employee.department.name if employee.department else None,
+        'job_title': employee.job_title.name if employee.job_title else None,
+        'photo': {
+            'small': employee.photo_small_url,
+            'medium': employee.photo_medium_url,
+            'large': employee.photo_large_url,
+        },
+        'bio_html': employee.bio_html,
+    }
+
+def employee_audit_state(employee):
+    # 稽核紀錄比對的欄位；自傳內容過長，不列入
+    user = employee.user
+    values = {
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'id_number': employee.id_number,
+        'gender': employee.gender,
+        'birth_date': employee.birth_date,
+        'department_id': employee.department_id,
+        'job_title_id': employee.job_title_id,
+        'photo': employee.photo.name if employee.photo else '',
+    }
+    return {field: '' if value is None else str(value) for field, value in values.items()}
+
+def typeahead_results(employee_ids, records):
+    records = {record.id: record for record in records}
+    return [
+        {
+            'id': record.id,
+            'username': record.username,
+            'name': f'{record.last_name}{record.first_name}',
+            'department': record.department_name or '',
+            'job_title': record.job_title_name or '',
+            'url': reverse('employee_edit', args=[record.id]),
+        }
+        for record in (records.get(employee_id) for employee_id in employee_ids)
+        if record is not None
+    ]
+
+
+def posted_date(params, key):
+    # 表單送出的日期字串；空白時為 None，格式不正確時拋出 ValueError
+    value = params.get(key, '').strip()
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f'日期 "{value}" 格式不正確，請使用 YYYY-MM-DD')
+    return day
+
+EMPLOYEE_PAGE_SIZE = 50
+EMPLOYEE_IMPORT_MAX_ERRORS = 200
+EMPLOYEE_SEARCH_LIMIT = 500
+EMPLOYEE_TYPEAHEAD_LIMIT = 10
+EMPLOYEE_SORT_FIELDS = {
+    'username': 'username',
+    'id_number': 'id_number',
+}
+EMPLOYEE_BULK_ACTIONS = {
+    'department': '調整部門',
+    'job_title': '調整職稱',
+    'group': '加入群組',
+    'delete': '刪除',
+}
+# 列表片段快取依賴的模型版本
+EMPLOYEE_TABLE_DEPENDS_ON = ('employee', 'user', 'department', 'jobtitle')
+EMPLOYEE_FILTERS_DEPENDS_ON = ('department', 'jobtitle')
+
 @login_required
 @user_passes_test(is_admin)
 def employee_list(request):
-    employees = Employee.objects.all().select_related('user', 'department', 'job_title')
-    return render(request, 'accounts/employee_list.html', {'employees': employees})
+    # 伺服器端篩選
+    filters, query, sort, order_field = employee_list_params(request)
+
+    def table_context():
+        employees = employee_queryset(filters, query, limit=EMPLOYEE_SEARCH_LIMIT)
+        paginator = KeysetPaginator(employees.for_listing(), order_field, per_page=EMPLOYEE_PAGE_SIZE)
+        page = paginator.page(request.GET.get('cursor'))
+        return {'employees': page, 'page': page, 'sort': sort}
+
+    def filters_context():
+        departments, job_titles = reference_data('department', 'jobtitle')
+        return {
+            'filters': filters,
+            'query': query,
+            'sort': sort,
+            'departments': departments,
+            'job_titles': job_titles,
+            'gender_choices': Employee.GENDER_CHOICES,
+        }
+
+    return render(request, 'accounts/employee_list.html', {
+        'filters_form': cached_fragment(
+            request, 'accounts/employee_filters.html', EMPLOYEE_FILTERS_DEPENDS_ON, filters_context,
+            vary_on=(sorted(filters.items()), query, sort),
+        ),
+        'table': cached_fragment(
+            request, 'accounts/employee_table.html', EMPLOYEE_TABLE_DEPENDS_ON, table_context,
+            vary_on=request_vary_on(request),
+        ),
+        **employee_bulk_context(filters, query),
+    })
+
+def employee_bulk_context(filters, query):
+    # 批次操作工具列：不放入片段快取，CSRF token 才會是本次請求的
+    departments, job_titles, groups = reference_data('department', 'jobtitle', 'group')
+    return {
+        'bulk_actions': EMPLOYEE_BULK_ACTIONS,
+        'bulk_filters': filters,
+        'bulk_query': query,
+        'bulk_targets': [
+            (action, EMPLOYEE_BULK_ACTIONS[action], choices)
+            for action, choices in (('department', departments), ('job_title', job_titles), ('group', groups))
+        ],
+    }
+
+def employee_bulk_selection(params):
+    # 勾選的員工，或所有符合目前篩選條件的員工
+    if params.get('scope') == 'filtered':
+        return employee_queryset(employee_filters(params), params.get('q', '').strip(), limit=EMPLOYEE_SEARCH_LIMIT)
+    employee_ids = [value for value in params.getlist('employees') if value.isdigit()]
+    return Employee.objects.filter(pk__in=employee_ids)
+
+def employee_bulk_target(action, raw_id):
+    model = {**REASSIGNABLE_FIELDS, 'group': Group}.get(action)
+    if model is None or not str(raw_id).isdigit():
+        return None
+    return model.objects.filter(pk=raw_id).first()
+
+def employee_list_url(params):
+    # 回到原本篩選條件下的員工列表
+    query = {key: params.get(key) for key in ('department', 'job_title', 'gender', 'q') if params.get(key)}
+    url = reverse('employee_list')
+    return f'{url}?{urlencode(query)}' if query else url
+
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def employee_bulk(request):
+    action = request.POST.get('action')
+    if action not in EMPLOYEE_BULK_ACTIONS:
+        messages.error(request, '請選擇批次操作')
+        return redirect(employee_list_url(request.POST))
+    target = None
+    if action != 'delete':
+        target = employee_bulk_target(action, request.POST.get(f'{action}_target'))
+        if target is None:
+            messages.error(request, f'請選擇要{EMPLOYEE_BULK_ACTIONS[action]}的目標')
+            return redirect(employee_list_url(request.POST))
+    employees = employee_bulk_selection(request.POST)
+    
+    # 第一次送出只顯示影響人數，確認後才執行
+    if 'confirm' not in request.POST:
+        return render(request, 'accounts/employee_bulk_confirm.html', {
+            'action': action,
+            'action_label': EMPLOYEE_BULK_ACTIONS[action],
+            'target': target,
+            'count': employees.count(),
+            'fields': [
+                (key, value) for key, values in request.POST.lists()
+                if key != 'csrfmiddlewaretoken' for value in values
+            ],
+            'cancel_url': employee_list_url(request.POST),
+        })
+    
+    if action == 'delete':
+        deleted = delete_employees(employees)
+        messages.success(request, f'已刪除 {deleted} 位員工')
+    elif action == 'group':
+        added = add_group_members(target, employees.values_list('user_id', flat=True))
+        messages.success(request, f'已將 {added} 位員工加入群組 "{target.name}"')
+    else:
+        changed = reassign_employees(employees, action, target)
+        messages.success(request, f'已將 {changed} 位員工{EMPLOYEE_BULK_ACTIONS[action]}為 "{target.name}"')
+    return redirect(employee_list_url(request.POST))
 
 @login_required
 @user_passes_test(is_admin)
@@ -263,16 +576,15 @@ def employee_create(request):
         last_name = request.POST.get('last_name')
         id_number = request.POST.get('id_number')
         gender = request.POST.get('gender')
-        birth_date = request.POST.get('birth_date') or None
         bio = request.POST.get('bio')
-        department_id = request.POST.get('department')
-        job_title_id = request.POST.get('job_title')
+        # 以整數比對，否則 Employee.save() 會把相同的 ID 字串當成異動，多做人數與快照更新
+        department_id = reference_choice_id(request.POST, 'department', 'department')
+        job_title_id = reference_choice_id(request.POST, 'job_title', 'jobtitle')
         
         # 檢查用戶名是否已存在
         if User.objects.filter(username=username).exists():
             messages.error(request, f'用戶名 "{username}" 已存在，請使用其他用戶名')
-            departments = Department.objects.all()
-            job_titles = JobTitle.objects.all()
+            departments, job_titles = reference_data('department', 'jobtitle')
             return render(request, 'accounts/employee_form.html', {
                 'departments': departments,
                 'job_titles': job_titles,
@@ -281,7 +593,9 @@ def employee_create(request):
             })
         
         try:
-            with transaction.atomic():
+            birth_date = posted_date(request.POST, 'birth_date')
+            # 用戶與員工都會觸發搜尋索引更新，合併為一次
+            with transaction.atomic(), deferred_indexing():
                 # 創建用戶
                 user = User.objects.create_user(
                     username=username,
@@ -303,6 +617,8 @@ def employee_create(request):
                 # 處理照片上傳
                 if 'photo' in request.FILES:
                     employee.photo = request.FILES['photo']
+                    employee.photo_hash = ''
+                    queue_photo_processing(employee.id)
                 
                 # 關聯部門和職稱
                 if department_id:
@@ -324,40 +640,92 @@ def employee_create(request):
         except Exception as e:
             messages.error(request, f'創建員工時出錯: {str(e)}')
     
-    # 獲取部門和職稱列表
-    departments = Department.objects.all()
-    job_titles = JobTitle.objects.all()
+    # 部門和職稱選項取自行程內的參考資料快取
+    departments, job_titles = reference_data('department', 'jobtitle')
     
     return render(request, 'accounts/employee_form.html', {
         'departments': departments,
         'job_titles': job_titles
     })
 
+@login_required
+@user_passes_test(is_admin)
+def employee_search(request):
+    # 搜尋框的即時建議，依相關度排序
+    query = request.GET.get('q', '').strip()
+    employee_ids = search_employee_ids(query, limit=EMPLOYEE_TYPEAHEAD_LIMIT) if query else []
+    records = Employee.objects.filter(pk__in=employee_ids).for_listing()
+    return JsonResponse({'results': typeahead_results(employee_ids, records)})
+
+@login_required
+@user_passes_test(is_admin)
+def employee_detail(request, employee_id):
+    employee = get_object_or_404(
+        Employee.objects.select_related('user', 'department', 'job_title').defer('bio'),
+        id=employee_id,
+    )
+    return JsonResponse(employee_detail_data(employee))
+
+@login_required
+@user_passes_test(is_admin)
+def employee_export(request):
+    # 匯出與列表目前的篩選條件與搜尋結果一致，但不受列表搜尋筆數上限限制
+    filters, query, _, _ = employee_list_params(request)
+    return export_response(request, 'employees', employee_queryset(filters, query))
+
+@login_required
+@user_passes_test(is_admin)
+def employee_import(request):
+    context = {'columns': IMPORT_COLUMNS}
+    
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, '請選擇要匯入的檔案')
+        else:
+            try:
+                result = EmployeeImporter().run(read_rows(upload.file, upload.name))
+            except ValueError as e:
+                messages.error(request, f'匯入員工時出錯: {str(e)}')
+            else:
+                if result.created:
+                    messages.success(request, f'已成功匯入 {result.created} 位員工')
+                if not result.errors:
+                    return redirect('employee_list')
+                messages.warning(request, f'{len(result.errors)} 行資料未匯入')
+                context['errors'] = result.errors[:EMPLOYEE_IMPORT_MAX_ERRORS]
+                context['error_count'] = len(result.errors)
+    
+    return render(request, 'accounts/employee_import.html', context)
+
 @login_required
 @user_passes_test(is_admin)
 def employee_edit(request, employee_id):
     employee = get_object_or_404(Employee, id=employee_id)
     
     if request.method == 'POST':
+        before = employee_audit_state(employee)
         # 獲取表單數據
         email = request.POST.get('email')
         first_name = request.POST.get('first_name')
         last_name = request.POST.get('last_name')
         id_number = request.POST.get('id_number')
         gender = request.POST.get('gender')
-        birth_date = request.POST.get('birth_date') or None
         bio = request.POST.get('bio')
-        department_id = request.POST.get('department')
-        job_title_id = request.POST.get('job_title')
+        # 以整數比對，否則 Employee.save() 會把相同的 ID 字串當成異動，多做人數與快照更新
+        department_id = reference_choice_id(request.POST, 'department', 'department')
+        job_title_id = reference_choice_id(request.POST, 'job_title', 'jobtitle')
         
         try:
-            with transaction.atomic():
+            birth_date = posted_date(request.POST, 'birth_date')
+            # 用戶與員工都會觸發搜尋索引更新，合併為一次
+            with transaction.atomic(), deferred_indexing():
                 # 更新用戶資料
                 user = employee.user
                 user.email = email
                 user.first_name = first_name
                 user.last_name = last_name
-                user.save()
+                user.save(update_fields=['email', 'first_name', 'last_name'])
                 
                 # 更新員工資料
                 employee.id_number = id_number
@@ -368,6 +736,8 @@ def employee_edit(request, employee_id):
                 # 處理照片上傳
                 if 'photo' in request.FILES:
                     employee.photo = request.FILES['photo']
+                    employee.photo_hash = ''
+                    queue_photo_processing(employee.id)
                 
                 # 關聯部門和職稱
                 employee.department_id = department_id if department_id else None
@@ -375,14 +745,17 @@ def employee_edit(request, employee_id):
                 
                 employee.save()
                 
+                changes = diff(before, employee_audit_state(employee))
+                if changes:
+                    record('employee.update', 'employee', employee.pk, employee.id_number, changes)
+                
                 messages.success(request, f'員工 "{user.username}" 資料已成功更新')
                 return redirect('employee_list')
         except Exception as e:
             messages.error(request, f'更新員工資料時出錯: {str(e)}')
     
-    # 獲取部門和職稱列表
-    departments = Department.objects.all()
-    job_titles = JobTitle.objects.all()
+    # 部門和職稱選項取自行程內的參考資料快取
+    departments, job_titles = reference_data('department', 'jobtitle')
     
     return render(request, 'accounts/employee_form.html', {
         'employee': employee,
@@ -410,50 +783,124 @@ def employee_delete(request, employee_id):
 @user_passes_test(is_admin)
 def user_permissions(request, user_id):
     user = User.objects.get(id=user_id)
-    user_permissions = user.user_permissions.all()
-    all_permissions = Permission.objects.all().order_by('content_type__app_label', 'codename')
-    user_groups = user.groups.all()
-    all_groups = Group.objects.all().order_by('name')
     
     if request.method == 'POST':
-        # Clear existing permissions
-        user.user_permissions.clear()
-        
-        # Add selected permissions
-        permission_ids = request.POST.getlist('permissions')
-        for permission_id in permission_ids:
-            permission = Permission.objects.get(id=permission_id)
-            user.user_permissions.add(permission)
-        
-        # Update staff status
-        if 'is_staff' in request.POST:
-            user.is_staff = True
-        else:
-            user.is_staff = False
+        with transaction.atomic():
+            # 只寫入與現有權限及群組的差異
+            sync_relation(user.user_permissions, request.POST.getlist('permissions'))
+            sync_relation(user.groups, request.POST.getlist('groups'))
             
-        # Update superuser status
-        if 'is_superuser' in request.POST:
-            user.is_superuser = True
-        else:
-            user.is_superuser = False
+            # Update staff and superuser status
+            is_staff = 'is_staff' in request.POST
+            is_superuser = 'is_superuser' in request.POST
+            if (user.is_staff, user.is_superuser) != (is_staff, is_superuser):
+                record('user.flags', 'user', user.pk, user.username, diff(
+                    {'is_staff': user.is_staff, 'is_superuser': user.is_superuser},
+                    {'is_staff': is_staff, 'is_superuser': is_superuser},
+                ))
+                user.is_staff = is_staff
+                user.is_superuser = is_superuser
+                user.save(update_fields=['is_staff', 'is_superuser'])
         
-        # Update group membership
-        user.groups.clear()
-        group_ids = request.POST.getlist('groups')
-        for group_id in group_ids:
-            group = Group.objects.get(id=group_id)
-            user.groups.add(group)
-            
-        user.save()
         messages.success(request, f'Permissions updated for {user.username}')
         return redirect('permissions_panel')
     
     context = {
         'user_obj': user,
-        'user_permissions': user_permissions,
-        'all_permissions': all_permissions,
-        'user_groups': user_groups,
-        'all_groups': all_groups,
+        'permission_tree': permission_tree(),
+        'assigned_permission_ids': set(user.user_permissions.values_list('id', flat=True)),
+        'user_group_ids': set(user.groups.values_list('id', flat=True)),
+        'all_groups': reference_data('group')[0],
     }
     
-    return render(request, 'accounts/user_permissions.html', context)
\ No newline at end of file
+    return render(request, 'accounts/user_permissions.html', context)
+
+# 稽核紀錄查詢
+AUDIT_PAGE_SIZE = 50
+AUDIT_TARGET_TYPES = (
+    ('user', '用戶'),
+    ('group', '群組'),
+    ('employee', '員工'),
+)
+
+def audit_day_start(value, days=0):
+    # 日期字串轉為當天 00:00（依目前時區）；格式錯誤時忽略
+    try:
+        day = parse_date(value) if value else None
+    except ValueError:
+        day = None
+    if day is None:
+        return None
+    moment = datetime.combine(day + timedelta(days=days), time.min)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+@login_required
+@user_passes_test(is_admin)
+def audit_log(request):
+    filters = {
+        'actor': request.GET.get('actor', '').strip(),
+        'target_type': request.GET.get('target_type', ''),
+        'target_id': request.GET.get('target_id', '').strip(),
+        'since': request.GET.get('since', ''),
+        'until': request.GET.get('until', ''),
+    }
+    if filters['target_type'] not in dict(AUDIT_TARGET_TYPES):
+        filters['target_type'] = ''
+    events = AuditEvent.objects.filtered(
+        actor=filters['actor'],
+        target_type=filters['target_type'],
+        target_id=filters['target_id'],
+        since=audit_day_start(filters['since']),
+        # 結束日期包含當天
+        until=audit_day_start(filters['until'], days=1),
+    )
+    paginator = KeysetPaginator(events.for_listing(), '-created_at', per_page=AUDIT_PAGE_SIZE)
+    page = paginator.page(request.GET.get('cursor'))
+    return render(request, 'accounts/audit_log.html', {
+        'events': page,
+        'page': page,
+        'filters': filters,
+        'target_types': AUDIT_TARGET_TYPES,
+    })
+
+# 人力分析儀表板：只讀取統計快照與歷史表，不掃描員工表
+@login_required
+@user_passes_test(is_admin)
+def analytics_dashboard(request):
+    return render(request, 'accounts/analytics_dashboard.html', dashboard_data())
+
+# Prometheus 指標：僅允許 INTERNAL_IPS 存取（DEBUG 時不限）
+def metrics(request):
+    if not settings.DEBUG and request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# 靜態檔案：沒有反向代理時由應用程式從 STATIC_ROOT 送出，優先使用預先壓縮的版本
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+def static_file(request, path):
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    file_path, encoding = precompressed_file(full_path, request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    mtime = os.stat(file_path).st_mtime
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type(full_path),
+                                filename=os.path.basename(full_path))
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(mtime)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    # 雜湊檔名隨內容改變，可永久快取；其他檔案每次向伺服器確認
+    is_hashed = getattr(staticfiles_storage, 'is_hashed', lambda name: False)
+    if is_hashed(path):
+        patch_cache_control(response, public=True, max_age=STATIC_IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,99 @@
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _template_names():
+    # 專案模板目錄與 accounts 的模板；admin 等套件的模板很少使用，不預先編譯
+    roots = [*engines['django'].engine.dirs, os.path.join(apps.get_app_config('accounts').path, 'templates')]
+    for root in roots:
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                if filename.endswith('.html'):
+                    yield os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, '/')
+
+
+def warm_templates():
+    # 預設的 cached loader 會保留編譯結果，之後的請求不再讀檔與解析
+    engine = engines['django']
+    for name in sorted(set(_template_names())):
+        engine.get_template(name)
+
+
+def warm_urls():
+    get_resolver().reverse_dict
+
+
+def warm_reference_data():
+    from .catalog import REFERENCE_TABLES, reference_data
+
+    reference_data(*REFERENCE_TABLES)
+
+
+def warm_content_types():
+    from django.contrib.contenttypes.models import ContentType
+
+    ContentType.objects.get_for_models(*apps.get_models())
+
+
+def warm_search():
+    from .search import get_backend
+
+    get_backend()
+
+
+def warm_static():
+    from .assets import VENDOR_ASSETS, vendor_asset_url
+
+    for name in VENDOR_ASSETS:
+        vendor_asset_url(name)
+
+
+WARMUP_STEPS = (
+    ('urls', warm_urls),
+    ('templates', warm_templates),
+    ('static', warm_static),
+    ('content types', warm_content_types),
+    ('reference data', warm_reference_data),
+    ('search', warm_search),
+)
+
+
+def warm_up():
+    """
+    Build in advance what a new worker would otherwise build on its first
+    requests: compiled templates, the URL resolver, the static manifest and
+    the per-process reference data and permission catalogues.
+
+    Returns ``[(step, seconds)]``. Database connections opened here are
+    closed at the end, so a preloading master can fork safely afterwards.
+    """
+    timings = []
+    try:
+        for name, step in WARMUP_STEPS:
+            started = time.perf_counter()
+            step()
+            timings.append((name, time.perf_counter() - started))
+    finally:
+        connections.close_all()
+    return timings
+
+
+def warm_up_on_start():
+    """Post-fork hook for the WSGI/ASGI entry points; a failed warm-up only logs."""
+    if not getattr(settings, 'ACCOUNTS_WARMUP_ON_START', False):
+        return
+    try:
+        timings = warm_up()
+    except Exception:
+        logger.exception('Worker warm-up failed')
+        return
+    logger.info('Worker warm-up: %s', ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings))
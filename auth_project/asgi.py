@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth_project.settings')
 
 application = get_asgi_application()
+
+# 每個 worker 載入此模組後（gunicorn --preload 時為 master fork 前）先預熱，第一個請求不需等待
+from accounts.warmup import warm_up_on_start  # noqa: E402
+
+warm_up_on_start()
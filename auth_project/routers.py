@@ -0,0 +1,30 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to the read-only ``replica`` connection and writes to ``default``.
+
+    Reads issued inside a transaction on ``default`` stay on it, so code such
+    as ``transaction.atomic()`` blocks sees its own uncommitted writes.
+    """
+
+    pool = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db in self.pool and obj2._state.db in self.pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
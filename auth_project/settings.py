@@ -27,6 +27,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# 允許存取 /metrics 的來源 IP
+INTERNAL_IPS = ['127.0.0.1']
+
 
 # Application definition
 
@@ -42,11 +45,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'accounts.middleware.RequestMetricsMiddleware',  # 查詢數、DB 與模板耗時
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.AuditContextMiddleware',  # 稽核紀錄的操作者
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +87,85 @@ DATABASES = {
     }
 }
 
+# 正式環境設定檔：DJANGO_DB_PROFILE=production 時啟用 WAL、持久連線與讀寫分離
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'development')
+
+# 正式環境讀寫連線的選項；accounts/tests/test_db_concurrency.py 以相同選項與讀寫分離測試並行寫入
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA busy_timeout=5000;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA mmap_size=268435456;'
+)
+SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': SQLITE_PRAGMAS,
+    # 交易一開始就取得寫入鎖，busy_timeout 才能生效，不會在升級鎖時直接失敗
+    'transaction_mode': 'IMMEDIATE',
+}
+# 唯讀連線的選項
+SQLITE_REPLICA_OPTIONS = {
+    'init_command': 'PRAGMA busy_timeout=5000; PRAGMA mmap_size=268435456; PRAGMA query_only=ON',
+}
+
+if DB_PROFILE == 'production':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        },
+        # 唯讀連線指向同一個 WAL 檔案；讀取不會被寫入交易阻塞
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{BASE_DIR / "db.sqlite3"}?mode=ro',
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': SQLITE_REPLICA_OPTIONS,
+            'TEST': {
+                'MIRROR': 'default',
+            },
+        },
+    }
+    DATABASE_ROUTERS = ['auth_project.routers.PrimaryReplicaRouter']
+
+
+# 快取：列表片段快取使用 ACCOUNTS_FRAGMENT_CACHE 指定的別名。
+# 多個 worker 必須共用同一個快取，版本號才會同步；正式環境使用 Redis（設定 DJANGO_REDIS_URL）或共用目錄的檔案快取
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+elif DB_PROFILE == 'production':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'auth-project',
+        }
+    }
+ACCOUNTS_FRAGMENT_CACHE = 'default'
+ACCOUNTS_FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+# 登入用戶與權限快照存在同一個快取中；session 先讀快取，寫入時同步寫回資料庫
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+ACCOUNTS_AUTH_SNAPSHOT_TIMEOUT = 60 * 60
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# 稽核紀錄由背景執行緒批次寫入：累積 BATCH_SIZE 筆或第一筆等待 FLUSH_INTERVAL 秒後寫入
+ACCOUNTS_AUDIT_BATCH_SIZE = 200
+ACCOUNTS_AUDIT_FLUSH_INTERVAL = 1.0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -118,6 +202,18 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic 產生含內容雜湊的檔名與 .gz/.br 壓縮檔；DEBUG 時直接使用原始檔名
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'accounts.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# 沒有反向代理提供 STATIC_ROOT 時，由應用程式送出靜態檔案；設定 DJANGO_SERVE_STATIC=0 停用
+ACCOUNTS_SERVE_STATIC = os.environ.get('DJANGO_SERVE_STATIC', '1') == '1'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -136,6 +232,46 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Employee photos directory
 EMPLOYEE_PHOTOS_DIR = 'employee_photos'
 
+# ASGI 部署模式：設定 DJANGO_ASYNC_VIEWS=1 時，列表與 JSON 端點使用 accounts.async_views
+ACCOUNTS_ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
+# 各視圖每次請求允許的 SQL 查詢數，可用 '視圖:方法' 個別設定；超出時記錄警告，
+# ACCOUNTS_QUERY_BUDGET_STRICT 為 True 時直接拋出例外。數值以快取全空時的請求為準
+# （含 session、登入快照與參考資料的載入），accounts/tests/test_query_budgets.py 以嚴格模式驗證
+ACCOUNTS_QUERY_BUDGETS = {
+    'permissions_panel': 8,
+    'user_permissions': 10,
+    'user_permissions:POST': 14,
+    'group_list': 5,
+    'group_permissions': 6,
+    'group_permissions:POST': 12,
+    'group_members': 9,
+    'group_members:POST': 12,
+    'department_list': 5,
+    'department_export': 4,
+    'jobtitle_list': 5,
+    'jobtitle_export': 4,
+    'employee_list': 10,
+    'employee_search': 6,
+    'employee_detail': 5,
+    'employee_export': 5,
+    'employee_edit': 8,
+    'employee_edit:POST': 18,
+    'audit_log': 4,
+    'analytics_dashboard': 7,
+}
+ACCOUNTS_QUERY_BUDGET_STRICT = False
+
+# 員工匯入的密碼雜湊：超過此列數才啟動行程池，較小的上傳在請求的行程內完成；
+# 行程數為 CPU 核心數與 ACCOUNTS_IMPORT_MAX_WORKERS 的較小者
+ACCOUNTS_IMPORT_PROCESS_THRESHOLD = 2000
+ACCOUNTS_IMPORT_MAX_WORKERS = 4
+
+# worker 啟動時預熱模板、URL、靜態檔案清單與參考資料；設定 DJANGO_WARMUP=0 停用
+ACCOUNTS_WARMUP_ON_START = os.environ.get('DJANGO_WARMUP', '1') == '1'
+# manage.py profile_imports 的啟動載入時間上限（毫秒）
+ACCOUNTS_IMPORT_BUDGET_MS = 1500
+
 # Summernote配置
 SUMMERNOTE_CONFIG = {
     'summernote': {
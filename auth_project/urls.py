@@ -1,17 +1,25 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic.base import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
+from accounts.views import metrics, static_file
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path('accounts/', include('django.contrib.auth.urls')),
     path('summernote/', include('django_summernote.urls')),
+    path('metrics', metrics, name='metrics'),
     path('', TemplateView.as_view(template_name='home.html'), name='home'),
 ]
 
+# 已 collectstatic 的靜態檔案（DEBUG 時由 runserver 的 staticfiles 處理）
+if settings.ACCOUNTS_SERVE_STATIC:
+    urlpatterns += [
+        re_path(rf'^{settings.STATIC_URL.strip("/")}/(?P<path>.+)$', static_file, name='static_file'),
+    ]
+
 # 添加媒體文件URL配置
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)